@@ -1,27 +1,61 @@
+from decimal import Decimal
+
 from django.contrib import admin
-from .models import Author, Publisher, Genre, Book, UserProfile, Order, OrderItem, Cart, CartItem
+from django.core.cache import cache
+from django.db.models import Sum
+from .models import Author, Publisher, Genre, Book, UserProfile, Order, OrderItem, Cart, CartItem, cart_price_total
+from .pagination import EstimatedCountPaginator
+from .search import search_books
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist без повного COUNT(*) на великих таблицях."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Author)
-class AuthorAdmin(admin.ModelAdmin):
-    list_display = ['first_name', 'last_name', 'birth_date']
+class AuthorAdmin(LargeTableAdmin):
+    list_display = ['first_name', 'last_name', 'birth_date', 'book_count', 'in_stock_book_count']
     search_fields = ['first_name', 'last_name']
     list_filter = ['birth_date']
 
 
 @admin.register(Publisher)
 class PublisherAdmin(admin.ModelAdmin):
-    list_display = ['name', 'website', 'email']
+    list_display = ['name', 'website', 'email', 'book_count', 'in_stock_book_count']
     search_fields = ['name']
 
 
 @admin.register(Genre)
 class GenreAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug']
+    list_display = ['name', 'slug', 'book_count', 'in_stock_book_count']
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
 
 
+class LanguageListFilter(admin.SimpleListFilter):
+    title = "Мова"
+    parameter_name = 'language'
+
+    def lookups(self, request, model_admin):
+
+        # DISTINCT over the whole book table is a full scan; the list of languages barely changes
+        languages = cache.get_or_set(
+            'bookstore:admin:languages',
+            lambda: list(Book.objects.order_by('language').values_list('language', flat=True).distinct()),
+            300,
+        )
+        return [(language, language) for language in languages]
+
+    def queryset(self, request, queryset):
+
+        if self.value():
+            return queryset.filter(language=self.value())
+        return queryset
+
+
 class BookAuthorInline(admin.TabularInline):
     model = Book.authors.through
     extra = 1
@@ -33,14 +67,16 @@ class BookGenreInline(admin.TabularInline):
 
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
-    list_display = ['title', 'get_authors_display', 'publisher', 'price', 'discount',
+class BookAdmin(LargeTableAdmin):
+    list_display = ['title', 'authors_display', 'publisher', 'price', 'discount',
                     'stock', 'is_available', 'created_at']
-    list_filter = ['publisher', 'genres', 'language', 'publication_date']
-    search_fields = ['title', 'isbn', 'authors__first_name', 'authors__last_name']
+    list_filter = ['publisher', 'genres', LanguageListFilter, 'publication_date']
+    # searched through the full-text index, see get_search_results
+    search_fields = ['title', 'authors_display', 'isbn']
     filter_horizontal = ['authors', 'genres']
-    date_hierarchy = 'publication_date'
     readonly_fields = ['views', 'created_at', 'updated_at']
+    # newest first by primary key; the model's -created_at has no index over the whole table
+    ordering = ['-id']
 
     fieldsets = (
         ('Основна інформація', {
@@ -61,6 +97,21 @@ class BookAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+
+        return super().get_queryset(request).select_related('publisher')
+
+    @admin.display(description="В наявності", boolean=True, ordering='stock')
+    def is_available(self, obj):
+        return obj.stock > 0
+
+    def get_search_results(self, request, queryset, search_term):
+
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return search_books(queryset, search_term), False
+
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -75,7 +126,7 @@ class OrderItemInline(admin.TabularInline):
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     list_display = ['id', 'user', 'status', 'total_price', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['user__username', 'user__email']
@@ -102,10 +153,25 @@ class CartItemInline(admin.TabularInline):
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(LargeTableAdmin):
     list_display = ['user', 'total_items', 'total_price', 'updated_at']
     search_fields = ['user__username']
     inlines = [CartItemInline]
 
+    def get_queryset(self, request):
+
+        return super().get_queryset(request).select_related('user').annotate(
+            items_total=Sum('items__quantity'),
+            price_total=cart_price_total('items__'),
+        )
+
+    @admin.display(description="Товарів", ordering='items_total')
+    def total_items(self, obj):
+        return obj.items_total or 0
+
+    @admin.display(description="Сума", ordering='price_total')
+    def total_price(self, obj):
+        return (obj.price_total or Decimal('0')).quantize(Decimal('0.01'))
+
 
 
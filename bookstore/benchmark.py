@@ -0,0 +1,289 @@
+import math
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from .models import Author, Book, Publisher
+
+
+def default_urls():
+
+    urls = [reverse('bookstore:index'), reverse('bookstore:book_list'),
+            reverse('bookstore:book_list') + '?sort_by=price_asc&page=2',
+            reverse('bookstore:author_list'), reverse('bookstore:publisher_list')]
+    book = Book.objects.order_by('-views').only('pk').first()
+    if book:
+        urls.append(reverse('bookstore:book_detail', args=[book.pk]))
+        title = Book.objects.filter(pk=book.pk).values_list('title', flat=True).get()
+        urls.append(reverse('bookstore:book_list') + '?query=' + urllib.request.quote(title.split()[0]))
+    author = Author.objects.order_by('-book_count').only('pk').first()
+    if author:
+        urls.append(reverse('bookstore:author_detail', args=[author.pk]))
+    publisher = Publisher.objects.order_by('-book_count').only('pk').first()
+    if publisher:
+        urls.append(reverse('bookstore:publisher_detail', args=[publisher.pk]))
+    return urls
+
+
+def percentile(values, percent):
+
+    # nearest-rank percentile, values must be sorted
+    if not values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(durations, errors, elapsed):
+
+    durations = sorted(durations)
+    ms = lambda value: None if value is None else round(value * 1000, 2)
+    return {
+        'requests': len(durations),
+        'errors': errors,
+        'p50_ms': ms(percentile(durations, 50)),
+        'p95_ms': ms(percentile(durations, 95)),
+        'p99_ms': ms(percentile(durations, 99)),
+        'mean_ms': ms(sum(durations) / len(durations)) if durations else None,
+        'rps': round(len(durations) / elapsed, 1) if elapsed else None,
+    }
+
+
+def session_cookie(username):
+
+    client = Client()
+    client.force_login(User.objects.get(username=username))
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def client_host():
+
+    # the first concrete ALLOWED_HOSTS entry; DEBUG with empty ALLOWED_HOSTS accepts localhost
+    return next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+
+
+class ClientTransport:
+    """Запити через django.test.Client у поточному процесі, по клієнту на потік."""
+
+    def __init__(self, cookie=None):
+        self.cookie = cookie
+        self.local = threading.local()
+
+    def get(self, url):
+
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(SERVER_NAME=client_host())
+        headers = {'HTTP_COOKIE': self.cookie} if self.cookie else {}
+        return client.get(url, **headers).status_code
+
+    def close(self):
+        pass
+
+
+class _QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class HTTPTransport:
+    """
+    Запити по HTTP: до вказаного base_url або до локального WSGI-сервера,
+    запущеного у фоновому потоці на вільному порту.
+    """
+
+    def __init__(self, base_url=None, cookie=None):
+        self.cookie = cookie
+        self.server = None
+        if base_url is None:
+            self.server = make_server('127.0.0.1', 0, WSGIHandler(),
+                                      server_class=_ThreadingWSGIServer, handler_class=_QuietHandler)
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            base_url = f'http://localhost:{self.server.server_port}'
+        self.base_url = base_url.rstrip('/')
+
+    def get(self, url):
+
+        request = urllib.request.Request(self.base_url + url)
+        if self.cookie:
+            request.add_header('Cookie', self.cookie)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    def close(self):
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def _worker(transport, jobs):
+
+    results = []
+    for url in jobs:
+        started = time.perf_counter()
+        try:
+            status = transport.get(url)
+        except Exception:
+            status = None
+        results.append((url, time.perf_counter() - started, status))
+    return results
+
+
+def _thread_worker(transport, jobs):
+
+    try:
+        return _worker(transport, jobs)
+    finally:
+        connections.close_all()
+
+
+def run_benchmark(transport, urls, requests=100, concurrency=1, warmup=1):
+    """
+    Робить `requests` GET-запитів на кожну адресу з `concurrency` потоків і
+    повертає p50/p95/p99, середнє та пропускну здатність по кожній адресі й загалом.
+    """
+
+    for url in urls:
+        for _ in range(warmup):
+            transport.get(url)
+
+    jobs = [url for _ in range(requests) for url in urls]
+    started = time.perf_counter()
+    if concurrency <= 1:
+        results = _worker(transport, jobs)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(_thread_worker, transport, jobs[i::concurrency]) for i in range(concurrency)]
+            results = [result for future in futures for result in future.result()]
+    elapsed = time.perf_counter() - started
+
+    per_url = {url: ([], 0) for url in urls}
+    for url, duration, status in results:
+        durations, errors = per_url[url]
+        if status is None or status >= 400:
+            per_url[url] = (durations, errors + 1)
+        else:
+            durations.append(duration)
+
+    # every url shares the same wall clock, so its throughput is its share of the total
+    report = {
+        'concurrency': concurrency,
+        'urls': {url: summarize(durations, errors, elapsed) for url, (durations, errors) in per_url.items()},
+        'total': summarize([duration for _, duration, status in results if status and status < 400],
+                           sum(errors for _, errors in per_url.values()), elapsed),
+    }
+    report['total']['elapsed_s'] = round(elapsed, 3)
+    return report
+
+
+# what SQLite does without the 'sqlite-wal' profile: rollback journal, fsync on every commit
+SQLITE_DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000}
+
+# a listing page and a book page per read, a view counter bump per write
+READ_SQL = [
+    "SELECT id, title, final_price, stock FROM bookstore_book WHERE stock > 0 ORDER BY created_at DESC, id DESC LIMIT 12",
+    "SELECT * FROM bookstore_book WHERE id = ?",
+]
+WRITE_SQL = "UPDATE bookstore_book SET views = views + 1 WHERE id = ?"
+
+
+def copy_sqlite_database(path):
+
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        connection.connection.backup(target)
+    finally:
+        target.close()
+
+
+def open_sqlite(path, pragmas):
+
+    db = sqlite3.connect(path, timeout=pragmas.get('busy_timeout', 5000) / 1000,
+                         isolation_level=None, check_same_thread=False)
+    for name, value in pragmas.items():
+        db.execute(f'PRAGMA {name}={value}')
+    return db
+
+
+def _sqlite_worker(path, pragmas, kind, book_ids, deadline, seed):
+
+    rng = random.Random(seed)
+    durations, errors = [], 0
+    db = open_sqlite(path, pragmas)
+    try:
+        while time.perf_counter() < deadline:
+            pk = rng.choice(book_ids)
+            started = time.perf_counter()
+            try:
+                if kind == 'read':
+                    db.execute(READ_SQL[0]).fetchall()
+                    db.execute(READ_SQL[1], (pk,)).fetchone()
+                else:
+                    db.execute('BEGIN IMMEDIATE')
+                    db.execute(WRITE_SQL, (pk,))
+                    db.execute('COMMIT')
+            except sqlite3.OperationalError:
+                # "database is locked" once busy_timeout runs out
+                errors += 1
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+            else:
+                durations.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    return kind, durations, errors
+
+
+def run_sqlite_contention(path, pragmas, readers=4, writers=1, seconds=5.0):
+    """
+    Паралельні читачі й записувачі на копії бази SQLite з указаними pragma.
+    Повертає p50/p95/p99 і кількість операцій за секунду окремо для читання й запису.
+    """
+
+    db = open_sqlite(path, pragmas)
+    try:
+        book_ids = [pk for pk, in db.execute("SELECT id FROM bookstore_book")]
+        journal_mode = db.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        db.close()
+    if not book_ids:
+        raise ValueError("У базі немає книг.")
+
+    kinds = ['read'] * readers + ['write'] * writers
+    started = time.perf_counter()
+    deadline = started + seconds
+    with ThreadPoolExecutor(max_workers=len(kinds)) as executor:
+        futures = [executor.submit(_sqlite_worker, path, pragmas, kind, book_ids, deadline, seed)
+                   for seed, kind in enumerate(kinds)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    report = {'journal_mode': journal_mode, 'readers': readers, 'writers': writers}
+    for kind in ('read', 'write'):
+        report[kind] = summarize([duration for done, durations, _ in results if done == kind for duration in durations],
+                                 sum(errors for done, _, errors in results if done == kind), elapsed)
+    return report
@@ -0,0 +1,82 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Author, Book, Genre, Publisher
+
+
+COUNTED_FIELDS = ['book_count', 'in_stock_book_count']
+
+
+def _count(queryset, key):
+
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(key).annotate(n=Count('*')).values('n'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def _counters(model):
+
+    if model is Publisher:
+        rows = Book.objects.filter(publisher=OuterRef('pk'))
+        in_stock = rows.filter(stock__gt=0)
+        key = 'publisher'
+    else:
+        through = Book.genres.through if model is Genre else Book.authors.through
+        key = 'genre' if model is Genre else 'author'
+        rows = through.objects.filter(**{key: OuterRef('pk')})
+        in_stock = rows.filter(book__stock__gt=0)
+    return {'book_count': _count(rows, key), 'in_stock_book_count': _count(in_stock, key)}
+
+
+def recount(model, ids=None):
+    """
+    Перераховує book_count та in_stock_book_count одним UPDATE для вказаних
+    записів (або для всіх, якщо ids=None). Лічильники завжди рахуються заново,
+    тому повторний виклик безпечний і виправляє будь-яке розходження.
+    """
+
+    queryset = model.objects.all()
+    if ids is not None:
+        ids = {pk for pk in ids if pk is not None}
+        if not ids:
+            return 0
+        queryset = queryset.filter(pk__in=ids)
+    return queryset.update(**_counters(model))
+
+
+def book_lookups(book_ids):
+    """Жанри, автори й видавництва, чиї лічильники залежать від цих книг."""
+
+    book_ids = list(book_ids)
+    return {
+        Genre: set(Book.genres.through.objects.filter(book_id__in=book_ids).values_list('genre_id', flat=True)),
+        Author: set(Book.authors.through.objects.filter(book_id__in=book_ids).values_list('author_id', flat=True)),
+        Publisher: set(Book.objects.filter(pk__in=book_ids).values_list('publisher_id', flat=True)),
+    }
+
+
+def recount_lookups(lookups):
+
+    for model, ids in lookups.items():
+        recount(model, ids)
+
+
+def recount_books(book_ids):
+
+    recount_lookups(book_lookups(book_ids))
+
+
+def reconcile():
+    """Перераховує всі лічильники; повертає {модель: кількість виправлених рядків}."""
+
+    fixed = {}
+    for model in (Genre, Author, Publisher):
+        before = {pk: values for pk, *values in model.objects.values_list('pk', *COUNTED_FIELDS)}
+        recount(model)
+        after = model.objects.values_list('pk', *COUNTED_FIELDS)
+        fixed[model] = sum(1 for pk, *values in after if before.get(pk) != values)
+    return fixed
@@ -0,0 +1,30 @@
+from django.db.models import Sum
+
+from .models import CartItem
+
+
+CART_COUNT_SESSION_KEY = 'cart_items_count'
+
+
+def get_cart_items_count(request):
+
+    if not request.user.is_authenticated:
+        return 0
+
+    count = request.session.get(CART_COUNT_SESSION_KEY)
+    if count is None:
+        count = CartItem.objects.filter(cart__user=request.user).aggregate(
+            count=Sum('quantity')
+        )['count'] or 0
+        request.session[CART_COUNT_SESSION_KEY] = count
+    return count
+
+
+def remember_cart_count(request, cart):
+
+    request.session[CART_COUNT_SESSION_KEY] = cart.total_items
+
+
+def invalidate_cart_count(request):
+
+    request.session.pop(CART_COUNT_SESSION_KEY, None)
@@ -0,0 +1,70 @@
+import hashlib
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cart import get_cart_items_count
+
+
+def _viewer(request):
+
+    # base.html renders the user menu and the cart badge
+    if not request.user.is_authenticated:
+        return 'anon'
+    return f'{request.user.pk}:{int(request.user.is_staff)}:{get_cart_items_count(request)}'
+
+
+def latest(*values):
+
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def conditional_page(validators, on_not_modified=None):
+    """
+    Повертає 304 без виконання view, якщо сторінка не змінилася.
+    validators(request, *args, **kwargs) повертає (список частин ETag, last_modified)
+    або None, коли перевірку треба пропустити (наприклад, об'єкта немає).
+    """
+
+    def decorator(view):
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            # pending flash messages are shown once and must reach the page
+            if len(get_messages(request)):
+                return view(request, *args, **kwargs)
+
+            result = validators(request, *args, **kwargs)
+            if result is None:
+                return view(request, *args, **kwargs)
+
+            parts, last_modified = result
+            parts = [_viewer(request), request.get_full_path(), *parts]
+            etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+            # a date cannot tell viewers apart, so signed-in users revalidate by ETag only
+            timestamp = None
+            if last_modified is not None and not request.user.is_authenticated:
+                timestamp = int(last_modified.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is not None:
+                if on_not_modified is not None:
+                    on_not_modified(request, *args, **kwargs)
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.headers.setdefault('ETag', etag)
+                if timestamp is not None:
+                    response.headers.setdefault('Last-Modified', http_date(timestamp))
+            return response
+
+        return wrapper
+
+    return decorator
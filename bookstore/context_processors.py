@@ -1,17 +1,8 @@
-from .models import Cart
+from .cart import get_cart_items_count
 
 
 def cart_processor(request):
 
-    cart_items_count = 0
-
-    if request.user.is_authenticated:
-        try:
-            cart = Cart.objects.get(user=request.user)
-            cart_items_count = cart.total_items
-        except Cart.DoesNotExist:
-            cart_items_count = 0
-
     return {
-        'cart_items_count': cart_items_count
-    }
\ No newline at end of file
+        'cart_items_count': get_cart_items_count(request)
+    }
@@ -0,0 +1,97 @@
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Буфер переглядів книг у пам'яті процесу. Перегляди накопичуються без
+    запису в БД і скидаються пакетно через UPDATE ... SET views = views + n,
+    тому втрачаються не більше ніж за один інтервал скидання.
+    """
+
+    def __init__(self):
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._stopped = threading.Event()
+
+    @property
+    def interval(self):
+        return getattr(settings, 'BOOKSTORE_VIEWS_FLUSH_INTERVAL', 10)
+
+    @property
+    def threshold(self):
+        return getattr(settings, 'BOOKSTORE_VIEWS_FLUSH_THRESHOLD', 1000)
+
+    def record(self, book_id, count=1):
+
+        with self._lock:
+            self._pending[book_id] += count
+            pending = self._pending[book_id]
+            total = sum(self._pending.values()) if self.threshold else 0
+
+        if self.threshold and total >= self.threshold:
+            self.flush()
+        else:
+            self._ensure_flusher()
+        return pending
+
+    def pending(self, book_id):
+
+        with self._lock:
+            return self._pending.get(book_id, 0)
+
+    def flush(self):
+
+        from .models import Book
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        by_increment = defaultdict(list)
+        for book_id, count in pending.items():
+            by_increment[count].append(book_id)
+
+        try:
+            with transaction.atomic():
+                for count, book_ids in by_increment.items():
+                    Book.objects.filter(pk__in=book_ids).update(views=F('views') + count)
+        except Exception:
+            logger.exception("Не вдалося зберегти перегляди книг, повертаю їх у буфер")
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return sum(pending.values())
+
+    def _ensure_flusher(self):
+
+        if self._flusher is not None or not self.interval:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._run, name='book-views-flusher', daemon=True)
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+view_counter = ViewCounter()
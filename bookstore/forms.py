@@ -262,6 +262,30 @@ class BookSearchForm(forms.Form):
             'class': 'form-control'
         })
     )
+    min_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_digits=10,
+        decimal_places=2,
+        label="Ціна від",
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Ціна від',
+            'step': '0.01'
+        })
+    )
+    max_price = forms.DecimalField(
+        required=False,
+        min_value=0,
+        max_digits=10,
+        decimal_places=2,
+        label="Ціна до",
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Ціна до',
+            'step': '0.01'
+        })
+    )
     sort_by = forms.ChoiceField(
         required=False,
         choices=[
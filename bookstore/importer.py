@@ -0,0 +1,260 @@
+import csv
+import datetime
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import book_counts, page_cache, search
+from .models import Author, Book, Genre, Publisher
+
+
+BOOK_FIELDS = ['title', 'publisher_id', 'description', 'pages', 'language', 'price',
+               'discount', 'publication_date', 'stock']
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def read_rows(stream, fmt):
+
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    elif fmt == 'jsonl':
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                yield {'__error__': f"некоректний JSON: {error}"}
+    else:
+        raise ValueError(f"Невідомий формат: {fmt}")
+
+
+def _split(value, separator):
+
+    if value is None:
+        return []
+    items = value if isinstance(value, (list, tuple)) else str(value).split(separator)
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def split_author_name(name):
+
+    first_name, _, last_name = name.rpartition(' ')
+    return first_name.strip()[:100], last_name[:100]
+
+
+def parse_row(row, separator=';'):
+
+    if '__error__' in row:
+        raise ImportRowError(row['__error__'])
+
+    title = str(row.get('title') or '').strip()
+    if not title:
+        raise ImportRowError("немає назви")
+
+    try:
+        price = Decimal(str(row.get('price') or '').strip())
+    except InvalidOperation:
+        raise ImportRowError(f"некоректна ціна: {row.get('price')!r}")
+
+    try:
+        publication_date = datetime.date.fromisoformat(str(row.get('publication_date') or '').strip())
+    except ValueError:
+        raise ImportRowError(f"некоректна дата: {row.get('publication_date')!r}")
+
+    try:
+        pages = int(row.get('pages') or 1)
+        discount = int(row.get('discount') or 0)
+        stock = int(row.get('stock') or 0)
+    except (TypeError, ValueError) as error:
+        raise ImportRowError(f"некоректне число: {error}")
+
+    isbn = str(row.get('isbn') or '').replace('-', '').strip() or None
+    if isbn and len(isbn) > 13:
+        raise ImportRowError(f"некоректний ISBN: {isbn}")
+
+    return {
+        'isbn': isbn,
+        'title': title[:300],
+        'description': row.get('description') or '',
+        'pages': max(pages, 1),
+        'language': str(row.get('language') or '').strip()[:50] or 'Українська',
+        'price': price,
+        'discount': max(discount, 0),
+        'publication_date': publication_date,
+        'stock': max(stock, 0),
+        'publisher': str(row.get('publisher') or '').strip()[:200],
+        'authors': [split_author_name(name) for name in _split(row.get('authors'), separator)],
+        'genres': [name[:100] for name in _split(row.get('genres'), separator)],
+    }
+
+
+class BookImporter:
+    """
+    Потоковий імпорт каталогу: рядки обробляються пакетами, книги
+    оновлюються або створюються за ISBN, а автори, видавництва й жанри
+    шукаються у словниках у пам'яті й створюються пакетно.
+    """
+
+    def __init__(self, batch_size=1000, separator=';', dry_run=False, on_error=None):
+        self.batch_size = batch_size
+        self.separator = separator
+        self.dry_run = dry_run
+        self.on_error = on_error or (lambda line, error: None)
+        self.stats = {'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'elapsed': 0.0}
+        self.publishers = dict(Publisher.objects.values_list('name', 'pk'))
+        self.genres = dict(Genre.objects.values_list('name', 'pk'))
+        self.authors = {
+            (first_name, last_name): pk
+            for pk, first_name, last_name in Author.objects.values_list('pk', 'first_name', 'last_name')
+        }
+
+    def run(self, rows, start=0, on_batch=None):
+        """Імпортує рядки, пропускаючи перші start; on_batch(line, stats) викликається після кожного пакета."""
+
+        started = time.monotonic()
+        rows = islice(rows, start, None)
+        line = start
+
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not chunk:
+                break
+
+            batch = []
+            for raw in chunk:
+                line += 1
+                try:
+                    batch.append(parse_row(raw, self.separator))
+                except ImportRowError as error:
+                    self.stats['skipped'] += 1
+                    self.on_error(line, error)
+
+            if batch:
+                self.import_batch(batch)
+            self.stats['rows'] = line - start
+            self.stats['elapsed'] = time.monotonic() - started
+            if on_batch:
+                on_batch(line, self.stats)
+
+        self.stats['elapsed'] = time.monotonic() - started
+        return self.stats
+
+    def import_batch(self, batch):
+
+        snapshot = (dict(self.publishers), dict(self.genres), dict(self.authors))
+        with transaction.atomic():
+            self._resolve_lookups(batch)
+            book_ids = self._upsert_books(batch)
+            self._link(batch, book_ids)
+            book_counts.recount_lookups(self._merge(self._previous_lookups, book_counts.book_lookups(book_ids)))
+            Book.refresh_authors_display(book_ids)
+            search.index_books(book_ids)
+            if self.dry_run:
+                transaction.set_rollback(True)
+            else:
+                transaction.on_commit(page_cache.invalidate)
+
+        if self.dry_run:
+            # rows created inside the rolled-back batch no longer exist
+            self.publishers, self.genres, self.authors = snapshot
+
+    def _resolve_lookups(self, batch):
+
+        names = {row['publisher'] for row in batch if row['publisher']} - set(self.publishers)
+        created = Publisher.objects.bulk_create([Publisher(name=name) for name in sorted(names)])
+        self.publishers.update({publisher.name: publisher.pk for publisher in created})
+
+        names = {name for row in batch for name in row['genres']} - set(self.genres)
+        created = Genre.objects.bulk_create([
+            Genre(name=name, slug=self._unique_slug(name)) for name in sorted(names)
+        ])
+        self.genres.update({genre.name: genre.pk for genre in created})
+
+        names = {name for row in batch for name in row['authors']} - set(self.authors)
+        created = Author.objects.bulk_create([
+            Author(first_name=first_name, last_name=last_name) for first_name, last_name in sorted(names)
+        ])
+        self.authors.update({(author.first_name, author.last_name): author.pk for author in created})
+
+    def _unique_slug(self, name):
+
+        base = slugify(name, allow_unicode=True)[:90] or 'genre'
+        slug, suffix = base, 1
+        while Genre.objects.filter(slug=slug).exists():
+            suffix += 1
+            slug = f'{base}-{suffix}'
+        return slug
+
+    def _upsert_books(self, batch):
+
+        now = timezone.now()
+        existing = dict(
+            Book.objects.filter(isbn__in=[row['isbn'] for row in batch if row['isbn']])
+            .values_list('isbn', 'pk')
+        )
+
+        # counters of the genres, authors and publishers the books leave need a recount too
+        self._previous_lookups = book_counts.book_lookups(existing.values())
+
+        # the last row wins when an ISBN repeats inside the batch
+        by_isbn = {}
+        without_isbn = []
+        for row in batch:
+            fields = {name: row[name] for name in BOOK_FIELDS if name != 'publisher_id'}
+            fields['publisher_id'] = self.publishers.get(row['publisher'])
+            book = Book(pk=existing.get(row['isbn']), isbn=row['isbn'], updated_at=now, **fields)
+            if row['isbn']:
+                by_isbn[row['isbn']] = book
+            else:
+                without_isbn.append(book)
+            row['book'] = book
+
+        to_update = [book for book in by_isbn.values() if book.pk]
+        to_create = [book for book in by_isbn.values() if not book.pk] + without_isbn
+        for book in to_create:
+            book.created_at = now
+
+        Book.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Book.objects.bulk_update(to_update, BOOK_FIELDS + ['updated_at'], batch_size=self.batch_size)
+        self.stats['created'] += len(to_create)
+        self.stats['updated'] += len(to_update)
+
+        for row in batch:
+            row['book_id'] = by_isbn[row['isbn']].pk if row['isbn'] else row['book'].pk
+        return sorted({row['book_id'] for row in batch})
+
+    def _merge(self, *lookups):
+
+        merged = {}
+        for item in lookups:
+            for model, ids in item.items():
+                merged.setdefault(model, set()).update(ids)
+        return merged
+
+    def _link(self, batch, book_ids):
+
+        BookAuthors = Book.authors.through
+        BookGenres = Book.genres.through
+        BookAuthors.objects.filter(book_id__in=book_ids).delete()
+        BookGenres.objects.filter(book_id__in=book_ids).delete()
+
+        authors = {(row['book_id'], self.authors[name]) for row in batch for name in row['authors']}
+        genres = {(row['book_id'], self.genres[name]) for row in batch for name in row['genres']}
+        BookAuthors.objects.bulk_create(
+            [BookAuthors(book_id=book_id, author_id=author_id) for book_id, author_id in authors],
+            batch_size=self.batch_size, ignore_conflicts=True
+        )
+        BookGenres.objects.bulk_create(
+            [BookGenres(book_id=book_id, genre_id=genre_id) for book_id, genre_id in genres],
+            batch_size=self.batch_size, ignore_conflicts=True
+        )
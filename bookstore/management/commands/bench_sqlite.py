@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookstore.benchmark import SQLITE_DEFAULT_PRAGMAS, copy_sqlite_database, run_sqlite_contention
+
+
+class Command(BaseCommand):
+    help = ("Порівнює паралельне читання й запис у SQLite зі стандартними pragma та з профілем "
+            "'sqlite-wal' (BOOKSTORE_SQLITE_PRAGMAS) на копіях поточної бази (JSON).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help="Кількість потоків, що читають.")
+        parser.add_argument('--writers', type=int, default=1, help="Кількість потоків, що пишуть.")
+        parser.add_argument('--seconds', type=float, default=5.0, help="Тривалість кожного прогону.")
+        parser.add_argument('--output', help="Файл для JSON-звіту (за замовчуванням — stdout).")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Команда порівнює налаштування SQLite, а поточна база — " + connection.vendor)
+        if options['readers'] < 0 or options['writers'] < 0 or options['readers'] + options['writers'] < 1:
+            raise CommandError("Потрібен хоча б один потік.")
+
+        profiles = {'default': SQLITE_DEFAULT_PRAGMAS, 'sqlite-wal': settings.BOOKSTORE_SQLITE_PRAGMAS}
+        report = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, pragmas in profiles.items():
+                # a fresh copy per profile: journal_mode=WAL sticks to the file
+                path = os.path.join(directory, f'{name}.sqlite3')
+                copy_sqlite_database(path)
+                try:
+                    report[name] = run_sqlite_contention(path, pragmas, options['readers'], options['writers'],
+                                                         options['seconds'])
+                except ValueError as error:
+                    raise CommandError(str(error))
+
+        ratio = lambda kind, key: (round(report['sqlite-wal'][kind][key] / report['default'][kind][key], 2)
+                                   if report['default'][kind][key] and report['sqlite-wal'][kind][key] else None)
+        report['gain'] = {'read_rps': ratio('read', 'rps'), 'write_rps': ratio('write', 'rps'),
+                          'read_p99_speedup': (round(1 / ratio('read', 'p99_ms'), 2)
+                                               if ratio('read', 'p99_ms') else None)}
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                stream.write(output + '\n')
+            self.stderr.write(f"Звіт записано у {options['output']}")
+        else:
+            self.stdout.write(output)
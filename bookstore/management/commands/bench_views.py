@@ -0,0 +1,50 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from bookstore.benchmark import ClientTransport, HTTPTransport, default_urls, run_benchmark, session_cookie
+
+
+class Command(BaseCommand):
+    help = "Навантажувальний тест сторінок: p50/p95/p99 і пропускна здатність по кожній адресі (JSON)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*', help="Адреси для тесту (за замовчуванням — основні сторінки каталогу).")
+        parser.add_argument('--requests', type=int, default=100, help="Кількість запитів на кожну адресу.")
+        parser.add_argument('--concurrency', type=int, default=1, help="Кількість паралельних потоків.")
+        parser.add_argument('--warmup', type=int, default=1, help="Кількість запитів на прогрів кожної адреси.")
+        parser.add_argument('--mode', choices=['client', 'wsgi'], default='client',
+                            help="client — тестовий клієнт Django у процесі; wsgi — HTTP до локального WSGI-сервера.")
+        parser.add_argument('--base-url', help="Тестувати вже запущений сервер замість локального (режим wsgi).")
+        parser.add_argument('--user', help="Ім'я користувача, від якого робити запити.")
+        parser.add_argument('--output', help="Файл для JSON-звіту (за замовчуванням — stdout).")
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--requests і --concurrency мають бути додатними.")
+
+        urls = options['urls'] or default_urls()
+        try:
+            cookie = session_cookie(options['user']) if options['user'] else None
+        except User.DoesNotExist:
+            raise CommandError(f"Користувача {options['user']} не знайдено.")
+        if options['mode'] == 'wsgi' or options['base_url']:
+            transport = HTTPTransport(options['base_url'], cookie=cookie)
+        else:
+            transport = ClientTransport(cookie=cookie)
+
+        try:
+            report = run_benchmark(transport, urls, requests=options['requests'],
+                                   concurrency=options['concurrency'], warmup=options['warmup'])
+        finally:
+            transport.close()
+        report['mode'] = 'wsgi' if isinstance(transport, HTTPTransport) else 'client'
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                stream.write(output + '\n')
+            self.stderr.write(f"Звіт записано у {options['output']}")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,48 @@
+from concurrent.futures import as_completed
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bookstore import thumbnails
+
+
+class Command(BaseCommand):
+    help = "Генерує зменшені варіанти для вже завантажених обкладинок, фото, логотипів і аватарів."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Перегенерувати варіанти, навіть якщо вони вже існують.")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Кількість процесів (за замовчуванням BOOKSTORE_THUMBNAIL_WORKERS).")
+
+    def handle(self, *args, **options):
+        force = options['force']
+        jobs = []
+        for (label, field_name), kind in thumbnails.IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            sizes = list(thumbnails.VARIANTS[kind].values())
+            names = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .order_by('pk').values_list(field_name, flat=True).iterator()
+            )
+            jobs.extend((name, sizes) for name in names)
+
+        workers = options['workers']
+        if workers is None:
+            workers = getattr(settings, 'BOOKSTORE_THUMBNAIL_WORKERS', 2)
+        executor = thumbnails.make_executor(workers) if workers > 0 else None
+
+        created = 0
+        if executor is None:
+            for name, sizes in jobs:
+                created += len(thumbnails.generate_variants(name, sizes, force))
+        else:
+            futures = [executor.submit(thumbnails.generate_variants, name, sizes, force) for name, sizes in jobs]
+            for future in as_completed(futures):
+                created += len(future.result())
+            executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Оброблено зображень: {len(jobs)}, створено варіантів: {created}"
+        ))
@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookstore.importer import BookImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Потоково імпортує каталог книг з CSV або JSON Lines (оновлення за ISBN)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Шлях до файлу або '-' для stdin.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="Формат вхідних даних (за замовчуванням — за розширенням файлу).")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Кількість рядків в одній транзакції.")
+        parser.add_argument('--separator', default=';',
+                            help="Роздільник авторів і жанрів у CSV.")
+        parser.add_argument('--checkpoint',
+                            help="Файл контрольної точки для відновлення перерваного імпорту.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Перевірити дані без збереження змін.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or self.detect_format(path)
+        checkpoint = options['checkpoint']
+        start = self.read_checkpoint(checkpoint, path)
+        if start:
+            self.stdout.write(f"Продовження з рядка {start}")
+
+        importer = BookImporter(
+            batch_size=options['batch_size'],
+            separator=options['separator'],
+            dry_run=options['dry_run'],
+            on_error=lambda line, error: self.stderr.write(f"Рядок {line}: {error}"),
+        )
+
+        def on_batch(line, stats):
+            if checkpoint and not options['dry_run']:
+                self.write_checkpoint(checkpoint, path, line)
+            self.stdout.write(
+                f"{line} рядків, {self.rate(stats):.0f} рядків/с"
+            )
+
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        try:
+            stats = importer.run(read_rows(stream, fmt), start=start, on_batch=on_batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        summary = (
+            f"Оброблено рядків: {stats['rows']}, створено: {stats['created']}, "
+            f"оновлено: {stats['updated']}, пропущено: {stats['skipped']}, "
+            f"{stats['elapsed']:.1f} с ({self.rate(stats):.0f} рядків/с)"
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Пробний запуск, зміни не збережено. {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+            self.stdout.write("Щоб оновити схожі книги, запустіть rebuild_related_books.")
+
+    def detect_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            return 'csv'
+        if extension in ('.jsonl', '.ndjson'):
+            return 'jsonl'
+        raise CommandError("Не вдалося визначити формат, вкажіть --format.")
+
+    def rate(self, stats):
+        return stats['rows'] / stats['elapsed'] if stats['elapsed'] else 0
+
+    def read_checkpoint(self, checkpoint, path):
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint, encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('source') != path:
+            raise CommandError(f"Контрольна точка {checkpoint} належить іншому файлу: {data.get('source')}")
+        return int(data.get('rows', 0))
+
+    def write_checkpoint(self, checkpoint, path, line):
+        tmp = f'{checkpoint}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as file:
+            json.dump({'source': path, 'rows': line}, file)
+        os.replace(tmp, checkpoint)
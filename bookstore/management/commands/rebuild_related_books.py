@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bookstore.related import rebuild_related_books
+
+
+class Command(BaseCommand):
+    help = "Перераховує таблицю схожих книг для всього каталогу."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Кількість книг, що обробляються за один прохід.")
+        parser.add_argument('--no-purchases', action='store_true',
+                            help="Не враховувати спільні покупки із замовлень.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            books, rows = rebuild_related_books(
+                batch_size=options['batch_size'],
+                use_purchases=not options['no_purchases'],
+            )
+        self.stdout.write(self.style.SUCCESS(f"Оброблено книг: {books}, збережено зв'язків: {rows}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bookstore import search
+
+
+class Command(BaseCommand):
+    help = "Перебудовує повнотекстовий індекс пошуку книг з нуля."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Кількість книг, що індексуються за один прохід.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Проіндексовано книг: {total}"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bookstore.book_counts import reconcile
+
+
+class Command(BaseCommand):
+    help = "Перераховує збережені лічильники книг у жанрів, авторів і видавництв."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = reconcile()
+        for model, count in fixed.items():
+            self.stdout.write(f"{model._meta.verbose_name_plural}: виправлено {count}")
+        self.stdout.write(self.style.SUCCESS("Лічильники узгоджено."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookstore.seeding import CatalogSeeder
+
+
+class Command(BaseCommand):
+    help = "Наповнює базу синтетичним каталогом для навантажувального тестування."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=10000, help="Кількість книг.")
+        parser.add_argument('--authors', type=int, default=2000, help="Кількість авторів.")
+        parser.add_argument('--publishers', type=int, default=200, help="Кількість видавництв.")
+        parser.add_argument('--genres', type=int, default=40, help="Кількість жанрів.")
+        parser.add_argument('--users', type=int, default=1000, help="Кількість користувачів (з кошиками).")
+        parser.add_argument('--orders', type=int, default=5000, help="Кількість замовлень.")
+        parser.add_argument('--seed', type=int, default=42, help="Зерно генератора випадкових чисел.")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Кількість рядків в одній вставці й транзакції.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size має бути додатним.")
+
+        def on_progress(stage, done, total):
+            self.stdout.write(f"{stage}: {done}/{total}")
+
+        seeder = CatalogSeeder(seed=options['seed'], batch_size=options['batch_size'], on_progress=on_progress)
+        try:
+            stats = seeder.run(**{name: options[name] for name in
+                                  ('publishers', 'genres', 'authors', 'books', 'users', 'orders')})
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        for stage, info in stats.items():
+            if stage != 'elapsed':
+                self.stdout.write(f"{stage}: {info['rows']} за {info['seconds']:.1f} с")
+        self.stdout.write(self.style.SUCCESS(f"Каталог згенеровано за {stats['elapsed']:.1f} с."))
+        self.stdout.write("Схожі книги: запустіть rebuild_related_books.")
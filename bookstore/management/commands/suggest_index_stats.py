@@ -0,0 +1,44 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from bookstore.benchmark import percentile
+from bookstore.suggest import suggest_index
+
+
+class Command(BaseCommand):
+    help = "Будує індекс підказок і показує його розмір у пам'яті та час пошуку."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookups', type=int, default=10000, help="Кількість пробних запитів.")
+        parser.add_argument('--seed', type=int, default=42, help="Зерно для вибору пробних префіксів.")
+
+    def handle(self, *args, **options):
+        suggest_index.reset()
+        suggest_index.build()
+        books = suggest_index.books
+
+        self.stdout.write(f"Побудова: {suggest_index.build_seconds:.1f} с")
+        for name in ('books', 'authors', 'isbns'):
+            index = getattr(suggest_index, name)
+            self.stdout.write(f"{name}: {len(index.pks)} записів, {len(index)} входжень, "
+                              f"{index.memory_usage() / 2 ** 20:.1f} МБ")
+        self.stdout.write(f"Разом: {suggest_index.memory_usage() / 2 ** 20:.1f} МБ")
+
+        titles = [label for label in books.labels if label]
+        if not titles:
+            return
+        rng = random.Random(options['seed'])
+        durations = []
+        for _ in range(options['lookups']):
+            title = rng.choice(titles)
+            query = title[:rng.randint(1, min(len(title), 12))]
+            started = time.perf_counter()
+            suggest_index.suggest(query)
+            durations.append(time.perf_counter() - started)
+        durations.sort()
+        self.stdout.write(
+            f"Пошук: p50 {percentile(durations, 50) * 1e6:.0f} мкс, "
+            f"p99 {percentile(durations, 99) * 1e6:.0f} мкс, max {durations[-1] * 1e6:.0f} мкс"
+        )
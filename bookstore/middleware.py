@@ -0,0 +1,64 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .timing import RequestTiming, current_timing
+
+
+logger = logging.getLogger('bookstore.timing')
+
+
+def get_sample_rate():
+
+    return getattr(settings, 'BOOKSTORE_TIMING_SAMPLE_RATE', 0.0)
+
+
+def get_slow_request_ms():
+
+    return getattr(settings, 'BOOKSTORE_SLOW_REQUEST_MS', 500)
+
+
+class ServerTimingMiddleware:
+    """
+    Для частини запитів (BOOKSTORE_TIMING_SAMPLE_RATE) рахує SQL-запити й час
+    БД, шаблонів і view, віддає їх у заголовку Server-Timing і пише в лог.
+    Для повільних запитів (BOOKSTORE_SLOW_REQUEST_MS) у лог потрапляє весь SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = get_sample_rate()
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            timing.view_time = time.perf_counter() - started
+            current_timing.reset(token)
+
+        response.headers['Server-Timing'] = timing.server_timing()
+        data = timing.as_dict(request, response)
+        logger.info(json.dumps(data, ensure_ascii=False), extra={'timing': data})
+
+        slow_ms = get_slow_request_ms()
+        if slow_ms and timing.view_time * 1000 >= slow_ms:
+            data = {**data, 'sql': [
+                {'db': alias, 'ms': round(duration * 1000, 1), 'sql': sql}
+                for alias, sql, duration in timing.queries
+            ]}
+            logger.warning(json.dumps(data, ensure_ascii=False), extra={'timing': data})
+        return response
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE bookstore_book_search USING fts5(
+        title, authors, description, isbn,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO bookstore_book_search (rowid, title, authors, description, isbn)
+    SELECT b.id, b.title,
+           COALESCE((SELECT group_concat(a.first_name || ' ' || a.last_name, ' ')
+                     FROM bookstore_book_authors ba
+                     JOIN bookstore_author a ON a.id = ba.author_id
+                     WHERE ba.book_id = b.id), ''),
+           b.description, COALESCE(b.isbn, '')
+    FROM bookstore_book b
+    """,
+]
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE TABLE bookstore_book_search (
+        book_id bigint PRIMARY KEY REFERENCES bookstore_book (id) ON DELETE CASCADE
+            DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX bookstore_book_search_document ON bookstore_book_search USING gin (document)",
+    """
+    INSERT INTO bookstore_book_search (book_id, document)
+    SELECT b.id,
+           setweight(to_tsvector('simple', b.title), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(b.isbn, '')), 'A') ||
+           setweight(to_tsvector('simple', COALESCE((
+               SELECT string_agg(a.first_name || ' ' || a.last_name, ' ')
+               FROM bookstore_book_authors ba
+               JOIN bookstore_author a ON a.id = ba.author_id
+               WHERE ba.book_id = b.id), '')), 'B') ||
+           setweight(to_tsvector('simple', b.description), 'D')
+    FROM bookstore_book b
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS bookstore_book_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookstore', '0002_alter_author_first_name_alter_author_last_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
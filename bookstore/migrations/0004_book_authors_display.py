@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 07:16
+
+from django.db import migrations, models
+
+
+def backfill_authors_display(apps, schema_editor):
+
+    Book = apps.get_model('bookstore', 'Book')
+    BookAuthors = Book.authors.through
+
+    names = {}
+    links = (
+        BookAuthors.objects
+        .order_by('author__last_name', 'author__first_name', 'author_id')
+        .values_list('book_id', 'author__first_name', 'author__last_name')
+    )
+    for book_id, first_name, last_name in links.iterator():
+        names.setdefault(book_id, []).append(f"{first_name} {last_name}")
+
+    books = [Book(pk=pk, authors_display=", ".join(full_names)) for pk, full_names in names.items()]
+    Book.objects.bulk_update(books, ['authors_display'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookstore', '0003_book_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='authors_display',
+            field=models.TextField(blank=True, editable=False, verbose_name='Автори (текст)'),
+        ),
+        migrations.RunPython(backfill_authors_display, migrations.RunPython.noop),
+    ]
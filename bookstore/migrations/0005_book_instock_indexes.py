@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-17 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookstore', '0004_book_authors_display'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['-created_at', '-id'], name='book_instock_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['-views', '-id'], name='book_instock_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['price', 'id'], name='book_instock_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['title', 'id'], name='book_instock_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['publisher', '-created_at', '-id'], name='book_publisher_instock_idx'),
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX book_authors_author_book_idx ON bookstore_book_authors (author_id, book_id)',
+            'DROP INDEX book_authors_author_book_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX book_genres_genre_book_idx ON bookstore_book_genres (genre_id, book_id)',
+            'DROP INDEX book_genres_genre_book_idx',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 07:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookstore', '0005_book_instock_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedBook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Оцінка схожості')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Позиція')),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='bookstore.book', verbose_name='Книга')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='bookstore.book', verbose_name='Схожа книга')),
+            ],
+            options={
+                'verbose_name': 'Схожа книга',
+                'verbose_name_plural': 'Схожі книги',
+                'ordering': ['book', 'rank'],
+                'unique_together': {('book', 'rank')},
+            },
+        ),
+    ]
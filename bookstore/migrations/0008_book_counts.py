@@ -0,0 +1,76 @@
+# Generated by Django 6.0 on 2026-10-17 09:40
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, key):
+
+    return Coalesce(
+        Subquery(queryset.order_by().values(key).annotate(n=Count('*')).values('n'), output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def backfill_book_counts(apps, schema_editor):
+
+    Book = apps.get_model('bookstore', 'Book')
+    for model_name, through, key in (('Genre', Book.genres.through, 'genre'),
+                                     ('Author', Book.authors.through, 'author')):
+        rows = through.objects.filter(**{key: OuterRef('pk')})
+        apps.get_model('bookstore', model_name).objects.update(
+            book_count=_count(rows, key),
+            in_stock_book_count=_count(rows.filter(book__stock__gt=0), key),
+        )
+
+    rows = Book.objects.filter(publisher=OuterRef('pk'))
+    apps.get_model('bookstore', 'Publisher').objects.update(
+        book_count=_count(rows, 'publisher'),
+        in_stock_book_count=_count(rows.filter(stock__gt=0), 'publisher'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookstore', '0007_catalog_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Книг'),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='in_stock_book_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Книг у наявності'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Книг'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='in_stock_book_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Книг у наявності'),
+        ),
+        migrations.AddField(
+            model_name='publisher',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Книг'),
+        ),
+        migrations.AddField(
+            model_name='publisher',
+            name='in_stock_book_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Книг у наявності'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(fields=['-in_stock_book_count', 'name'], name='genre_instock_count_idx'),
+        ),
+        migrations.RunPython(backfill_book_counts, migrations.RunPython.noop),
+    ]
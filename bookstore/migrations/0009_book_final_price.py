@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-17 10:20
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookstore', '0008_book_counts'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='book',
+            name='book_instock_price_idx',
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='final_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount'))), '*', models.Value(Decimal('0.01'))), 2), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Ціна зі знижкою'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['final_price', 'id'], name='book_instock_price_idx'),
+        ),
+    ]
@@ -1,5 +1,11 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Round
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.core.validators import MinValueValidator
 from django.utils.text import slugify
 
@@ -11,6 +17,9 @@ class Author(models.Model):
     bio = models.TextField(blank=True, verbose_name="Біографія")
     photo = models.ImageField(upload_to='authors/', blank=True, null=True, verbose_name="Фото")
     birth_date = models.DateField(blank=True, null=True, verbose_name="Дата народження")
+    book_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Книг")
+    in_stock_book_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Книг у наявності")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
 
     class Meta:
         verbose_name = "Автор"
@@ -31,6 +40,9 @@ class Publisher(models.Model):
     website = models.URLField(blank=True, verbose_name="Веб-сайт")
     email = models.EmailField(blank=True, verbose_name="Email")
     logo = models.ImageField(upload_to='publishers/', blank=True, null=True, verbose_name="Логотип")
+    book_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Книг")
+    in_stock_book_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Книг у наявності")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
 
     class Meta:
         verbose_name = "Видавництво"
@@ -46,11 +58,17 @@ class Genre(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name="Назва")
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     description = models.TextField(blank=True, verbose_name="Опис")
+    book_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Книг")
+    in_stock_book_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Книг у наявності")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
 
     class Meta:
         verbose_name = "Жанр"
         verbose_name_plural = "Жанри"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-in_stock_book_count', 'name'], name='genre_instock_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -61,6 +79,18 @@ class Genre(models.Model):
         super().save(*args, **kwargs)
 
 
+class BookQuerySet(models.QuerySet):
+
+    # columns the catalog cards render, plus created_at and views that listings sort and paginate by
+    CARD_FIELDS = ('title', 'authors_display', 'cover_image', 'price', 'discount', 'final_price',
+                   'stock', 'views', 'created_at', 'publisher__name')
+
+    def cards(self):
+        """Книги для карток у списках: без опису та інших полів, яких картки не показують."""
+
+        return self.select_related('publisher').only(*self.CARD_FIELDS)
+
+
 class Book(models.Model):
 
     title = models.CharField(max_length=300, verbose_name="Назва")
@@ -68,6 +98,7 @@ class Book(models.Model):
     publisher = models.ForeignKey(Publisher, on_delete=models.SET_NULL, null=True,
                                   related_name='books', verbose_name="Видавництво")
     genres = models.ManyToManyField(Genre, related_name='books', verbose_name="Жанри")
+    authors_display = models.TextField(blank=True, editable=False, verbose_name="Автори (текст)")
 
     isbn = models.CharField(max_length=13, unique=True, blank=True, null=True, verbose_name="ISBN")
     description = models.TextField(verbose_name="Опис")
@@ -78,6 +109,13 @@ class Book(models.Model):
                                 validators=[MinValueValidator(0)], verbose_name="Ціна")
     discount = models.IntegerField(default=0, validators=[MinValueValidator(0)],
                                    verbose_name="Знижка (%)")
+    # computed by the database so listings can sort and filter by what the customer pays
+    final_price = models.GeneratedField(
+        expression=Round(F('price') * (100 - F('discount')) * Value(Decimal('0.01')), 2),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+        verbose_name="Ціна зі знижкою",
+    )
 
     cover_image = models.ImageField(upload_to='books/covers/', blank=True, null=True,
                                     verbose_name="Обкладинка")
@@ -90,21 +128,28 @@ class Book(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
 
+    objects = BookQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Книга"
         verbose_name_plural = "Книги"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(stock__gt=0),
+                         name='book_instock_created_idx'),
+            models.Index(fields=['-views', '-id'], condition=models.Q(stock__gt=0),
+                         name='book_instock_views_idx'),
+            models.Index(fields=['final_price', 'id'], condition=models.Q(stock__gt=0),
+                         name='book_instock_price_idx'),
+            models.Index(fields=['title', 'id'], condition=models.Q(stock__gt=0),
+                         name='book_instock_title_idx'),
+            models.Index(fields=['publisher', '-created_at', '-id'], condition=models.Q(stock__gt=0),
+                         name='book_publisher_instock_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def final_price(self):
-
-        if self.discount > 0:
-            return self.price * (1 - self.discount / 100)
-        return self.price
-
     @property
     def is_available(self):
 
@@ -112,7 +157,51 @@ class Book(models.Model):
 
     def get_authors_display(self):
 
-        return ", ".join([author.get_full_name() for author in self.authors.all()])
+        return self.authors_display
+
+    @classmethod
+    def refresh_authors_display(cls, book_ids):
+
+        book_ids = set(book_ids)
+        if not book_ids:
+            return {}
+
+        names = {pk: [] for pk in book_ids}
+        links = (
+            cls.authors.through.objects
+            .filter(book_id__in=book_ids)
+            .order_by('author__last_name', 'author__first_name', 'author_id')
+            .values_list('book_id', 'author__first_name', 'author__last_name')
+        )
+        for book_id, first_name, last_name in links:
+            names[book_id].append(f"{first_name} {last_name}")
+
+        now = timezone.now()
+        books = [
+            cls(pk=pk, authors_display=", ".join(full_names), updated_at=now)
+            for pk, full_names in names.items()
+        ]
+        cls.objects.bulk_update(books, ['authors_display', 'updated_at'], batch_size=500)
+        return {book.pk: book.authors_display for book in books}
+
+
+class RelatedBook(models.Model):
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='related_entries',
+                             verbose_name="Книга")
+    related = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='related_from',
+                                verbose_name="Схожа книга")
+    score = models.FloatField(verbose_name="Оцінка схожості")
+    rank = models.PositiveSmallIntegerField(verbose_name="Позиція")
+
+    class Meta:
+        verbose_name = "Схожа книга"
+        verbose_name_plural = "Схожі книги"
+        ordering = ['book', 'rank']
+        unique_together = ('book', 'rank')
+
+    def __str__(self):
+        return f"{self.book_id} → {self.related_id} ({self.score:.2f})"
 
 
 class UserProfile(models.Model):
@@ -189,6 +278,12 @@ class OrderItem(models.Model):
         return self.price * self.quantity
 
 
+def cart_price_total(prefix=''):
+
+    return Sum(F(f'{prefix}book__final_price') * F(f'{prefix}quantity'),
+               output_field=models.DecimalField(max_digits=16, decimal_places=2))
+
+
 class Cart(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart',
@@ -203,13 +298,23 @@ class Cart(models.Model):
     def __str__(self):
         return f"Кошик {self.user.username}"
 
+    @cached_property
+    def totals(self):
+
+        totals = self.items.aggregate(items=Sum('quantity'), price=cart_price_total())
+        price = totals['price'] or Decimal('0')
+        return {
+            'items': totals['items'] or 0,
+            'price': price.quantize(Decimal('0.01')),
+        }
+
     @property
     def total_price(self):
-        return sum(item.total_price for item in self.items.all())
+        return self.totals['price']
 
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.totals['items']
 
 
 class CartItem(models.Model):
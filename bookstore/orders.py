@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, When
+from django.utils import timezone
+
+from . import book_counts, page_cache
+from .models import Book, OrderItem
+
+
+class InsufficientStock(Exception):
+
+    def __init__(self, book):
+        super().__init__(f'Недостатньо "{book.title}" на складі.')
+        self.book = book
+
+
+def _per_book(quantities):
+
+    return Case(
+        *[When(pk=book_id, then=quantity) for book_id, quantity in quantities.items()],
+        output_field=IntegerField()
+    )
+
+
+def reserve_stock(quantities):
+    """
+    Списує кількості {book_id: quantity} одним умовним UPDATE. Якщо хоча б
+    одної книги не вистачає, нічого не змінюється і виникає InsufficientStock.
+    Має викликатися всередині transaction.atomic().
+    """
+
+    if not quantities:
+        return
+    updated = Book.objects.filter(
+        pk__in=list(quantities), stock__gte=_per_book(quantities)
+    ).update(stock=F('stock') - _per_book(quantities), updated_at=timezone.now())
+
+    if updated != len(quantities):
+        short = Book.objects.filter(
+            pk__in=list(quantities), stock__lt=_per_book(quantities)
+        ).order_by('pk').first()
+        raise InsufficientStock(short or Book(title='?'))
+
+    # every book left at zero has just gone out of stock
+    book_counts.recount_books(Book.objects.filter(pk__in=list(quantities), stock=0).values_list('pk', flat=True))
+
+
+def place_order(order, cart):
+
+    with transaction.atomic():
+        cart_items = list(cart.items.select_related('book').order_by('book_id'))
+        if not cart_items:
+            return None
+
+        quantities = {item.book_id: item.quantity for item in cart_items}
+        reserve_stock(quantities)
+
+        order.total_price = sum(item.book.final_price * item.quantity for item in cart_items)
+        order.save()
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, book=item.book, quantity=item.quantity, price=item.book.final_price)
+            for item in cart_items
+        ])
+        cart.items.all().delete()
+        # the stock shown on cached catalog pages has changed
+        transaction.on_commit(page_cache.invalidate)
+    return order
@@ -0,0 +1,112 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+
+VERSION_KEY = 'bookstore:pages:version'
+
+
+def get_cache():
+
+    return caches[getattr(settings, 'BOOKSTORE_PAGE_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+
+    return getattr(settings, 'BOOKSTORE_PAGE_CACHE_TIMEOUT', 600)
+
+
+def is_enabled():
+
+    return get_timeout() > 0
+
+
+def current_version():
+
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate():
+    """Робить недійсними всі збережені сторінки: нова версія — нові ключі, старі просто застаріють."""
+
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 2, None)
+
+
+def page_key(request, version):
+
+    # parameter order and empty filters do not change the page
+    params = sorted((key, value) for key, values in request.GET.lists() for value in values if value)
+    raw = f'{request.path}?{urlencode(params)}'
+    return f'bookstore:page:{version}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def _cacheable_request(request):
+
+    return (
+        is_enabled()
+        and request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        # a pending flash message belongs to this visitor only
+        and not len(get_messages(request))
+    )
+
+
+def _cacheable_response(request, response):
+
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def anonymous_page_cache(on_hit=None):
+    """
+    Кешує сторінку для анонімних відвідувачів за шляхом і нормалізованим
+    query string. Ключ містить версію, яку сигнали збільшують при зміні каталогу.
+    """
+
+    def decorator(view):
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = page_key(request, current_version())
+            response = cache.get(key)
+            if response is not None:
+                if on_hit is not None:
+                    on_hit(request, *args, **kwargs)
+                return get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    last_modified=parse_http_date_safe(response.get('Last-Modified')),
+                    response=response,
+                )
+
+            response = view(request, *args, **kwargs)
+            if _cacheable_response(request, response):
+                cache.set(key, response, get_timeout())
+            return response
+
+        return wrapper
+
+    return decorator
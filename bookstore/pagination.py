@@ -0,0 +1,204 @@
+import datetime
+import decimal
+import json
+
+from django.conf import settings
+from django.core import signing
+from django.core.paginator import Paginator
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+CURSOR_SALT = 'bookstore.pagination.cursor'
+
+
+def use_cursor_pagination(request):
+
+    return 'cursor' in request.GET or getattr(settings, 'BOOKSTORE_CURSOR_PAGINATION', False)
+
+
+def _encode_value(value):
+
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def _parse_ordering(ordering):
+
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def estimate_count(queryset, limit=None):
+    """
+    Кількість рядків без повного COUNT(*): на PostgreSQL — оцінка планувальника,
+    на інших базах — COUNT, обмежений `limit` рядками.
+    """
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    if limit is None:
+        return queryset.order_by().count()
+    return queryset.order_by()[:limit].count()
+
+
+class CursorPage:
+
+    is_cursor_page = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset-пагінація: сторінка вибирається умовою WHERE по ключу сортування,
+    тому глибокі сторінки коштують стільки ж, скільки перша.
+    Останнє поле ordering має бути унікальним (зазвичай 'id').
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_limit=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = _parse_ordering(self.ordering)
+        if count_limit is None:
+            count_limit = getattr(settings, 'BOOKSTORE_CURSOR_COUNT_LIMIT', 1000)
+        self.count_limit = count_limit
+        self._count = None
+
+    def encode_cursor(self, obj, direction):
+
+        values = [_encode_value(getattr(obj, name)) for name, _ in self.fields]
+        payload = {'o': list(self.ordering), 'v': values, 'd': direction}
+        return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+
+        if not cursor:
+            return None
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+        except (signing.BadSignature, json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if payload.get('o') != list(self.ordering) or payload.get('d') not in ('n', 'p'):
+            return None
+        if len(payload.get('v', [])) != len(self.fields):
+            return None
+        return payload['v'], payload['d']
+
+    def _to_python(self, name, value):
+
+        model = self.queryset.model
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            annotation = self.queryset.query.annotations.get(name)
+            field = getattr(annotation, 'output_field', None)
+        return field.to_python(value) if field is not None else value
+
+    def _keyset_filter(self, values, reverse):
+
+        values = [self._to_python(name, value) for (name, _), value in zip(self.fields, values)]
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _reversed_ordering(self):
+
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+
+    def page(self, cursor=None):
+
+        decoded = self.decode_cursor(cursor)
+        queryset = self.queryset.order_by(*self.ordering)
+
+        if decoded is None:
+            rows = list(queryset[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_next, has_previous = has_more, False
+        else:
+            values, direction = decoded
+            if direction == 'n':
+                rows = list(queryset.filter(self._keyset_filter(values, reverse=False))[:self.per_page + 1])
+                has_more = len(rows) > self.per_page
+                rows = rows[:self.per_page]
+                has_next, has_previous = has_more, True
+            else:
+                queryset = self.queryset.order_by(*self._reversed_ordering())
+                rows = list(queryset.filter(self._keyset_filter(values, reverse=True))[:self.per_page + 1])
+                has_more = len(rows) > self.per_page
+                rows = rows[:self.per_page][::-1]
+                has_next, has_previous = True, has_more
+
+        next_cursor = self.encode_cursor(rows[-1], 'n') if rows and has_next else None
+        previous_cursor = self.encode_cursor(rows[0], 'p') if rows and has_previous else None
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+    get_page = page
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = self._estimate_count()
+        return self._count
+
+    @property
+    def count_is_capped(self):
+
+        return self.count_limit is not None and self.count >= self.count_limit
+
+    def _estimate_count(self):
+
+        return estimate_count(self.queryset, self.count_limit)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Звичайний Paginator для адмінки, який не рахує всю таблицю: кількість
+    береться з estimate_count і обмежена BOOKSTORE_ADMIN_COUNT_LIMIT.
+    """
+
+    @cached_property
+    def count(self):
+
+        limit = getattr(settings, 'BOOKSTORE_ADMIN_COUNT_LIMIT', 10000)
+        return estimate_count(self.object_list, limit)
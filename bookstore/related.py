@@ -0,0 +1,192 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from . import page_cache
+from .models import Book, OrderItem, RelatedBook
+
+
+DEFAULT_WEIGHTS = {
+    'genre': 1.0,
+    'author': 2.0,
+    'purchase': 0.5,
+}
+
+
+def get_weights():
+
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'BOOKSTORE_RELATED_WEIGHTS', {})}
+
+
+def get_limit():
+
+    return getattr(settings, 'BOOKSTORE_RELATED_LIMIT', 8)
+
+
+def get_candidates_per_genre():
+
+    return getattr(settings, 'BOOKSTORE_RELATED_CANDIDATES_PER_GENRE', 200)
+
+
+def _chunks(values, size=900):
+
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _group(pairs):
+
+    grouped = defaultdict(set)
+    for key, value in pairs:
+        grouped[key].add(value)
+    return grouped
+
+
+class RelatedBooksBuilder:
+    """
+    Рахує схожі книги для пакета книг: спільні жанри й автори та (за бажанням)
+    спільні покупки. Кандидати з жанрів обмежуються найпопулярнішими книгами
+    жанру, щоб великі жанри не робили прохід квадратичним.
+    """
+
+    def __init__(self, use_purchases=True):
+        self.weights = get_weights()
+        self.limit = get_limit()
+        self.candidates_per_genre = get_candidates_per_genre()
+        self.use_purchases = use_purchases and self.weights['purchase'] > 0
+        self._genre_candidates = {}
+
+    def genre_candidates(self, genre_ids):
+
+        missing = [pk for pk in genre_ids if pk not in self._genre_candidates]
+        for genre_id in missing:
+            self._genre_candidates[genre_id] = list(
+                Book.genres.through.objects
+                .filter(genre_id=genre_id, book__stock__gt=0)
+                .order_by('-book__views', '-book_id')
+                .values_list('book_id', flat=True)[:self.candidates_per_genre]
+            )
+        return {pk: self._genre_candidates[pk] for pk in genre_ids}
+
+    def co_purchases(self, book_ids):
+
+        orders = _group(
+            OrderItem.objects
+            .filter(order__in=OrderItem.objects.filter(book_id__in=book_ids).values('order_id'))
+            .values_list('order_id', 'book_id')
+        )
+        counts = defaultdict(Counter)
+        targets = set(book_ids)
+        for books in orders.values():
+            for book_id in books & targets:
+                counts[book_id].update(books - {book_id})
+        return counts
+
+    def compute(self, book_ids):
+
+        book_ids = list(book_ids)
+        Genres = Book.genres.through
+        Authors = Book.authors.through
+
+        target_genres = _group(Genres.objects.filter(book_id__in=book_ids).values_list('book_id', 'genre_id'))
+        target_authors = _group(Authors.objects.filter(book_id__in=book_ids).values_list('book_id', 'author_id'))
+        purchases = self.co_purchases(book_ids) if self.use_purchases else {}
+
+        all_genres = set().union(*target_genres.values()) if target_genres else set()
+        all_authors = set().union(*target_authors.values()) if target_authors else set()
+        by_genre = self.genre_candidates(sorted(all_genres))
+        by_author = _group(
+            Authors.objects.filter(author_id__in=all_authors, book__stock__gt=0)
+            .values_list('author_id', 'book_id')
+        )
+
+        candidates = {}
+        for book_id in book_ids:
+            found = set()
+            for genre_id in target_genres.get(book_id, ()):
+                found.update(by_genre[genre_id])
+            for author_id in target_authors.get(book_id, ()):
+                found.update(by_author.get(author_id, ()))
+            found.update(purchases.get(book_id, {}))
+            found.discard(book_id)
+            candidates[book_id] = found
+
+        all_candidates = set().union(*candidates.values()) if candidates else set()
+        in_stock = {}
+        candidate_genres = defaultdict(set)
+        candidate_authors = defaultdict(set)
+        for chunk in _chunks(all_candidates):
+            in_stock.update(Book.objects.filter(pk__in=chunk, stock__gt=0).values_list('pk', 'views'))
+            for book_id, genre_id in Genres.objects.filter(book_id__in=chunk).values_list('book_id', 'genre_id'):
+                candidate_genres[book_id].add(genre_id)
+            for book_id, author_id in Authors.objects.filter(book_id__in=chunk).values_list('book_id', 'author_id'):
+                candidate_authors[book_id].add(author_id)
+
+        results = {}
+        for book_id in book_ids:
+            scored = []
+            for candidate in candidates[book_id]:
+                if candidate not in in_stock:
+                    continue
+                score = (
+                    self.weights['genre'] * len(target_genres.get(book_id, set()) & candidate_genres.get(candidate, set())) +
+                    self.weights['author'] * len(target_authors.get(book_id, set()) & candidate_authors.get(candidate, set())) +
+                    self.weights['purchase'] * purchases.get(book_id, {}).get(candidate, 0)
+                )
+                if score > 0:
+                    scored.append((-score, -in_stock[candidate], candidate))
+            scored.sort()
+            results[book_id] = [(candidate, -score) for score, _, candidate in scored[:self.limit]]
+        return results
+
+    def store(self, results):
+
+        rows = [
+            RelatedBook(book_id=book_id, related_id=related_id, score=score, rank=rank)
+            for book_id, related in results.items()
+            for rank, (related_id, score) in enumerate(related)
+        ]
+        with transaction.atomic():
+            RelatedBook.objects.filter(book_id__in=list(results)).delete()
+            RelatedBook.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+def refresh_related_books(book_ids, use_purchases=True):
+
+    book_ids = set(book_ids)
+    if not book_ids:
+        return 0
+    # books that currently point at a changed book may rank it differently now
+    book_ids.update(
+        RelatedBook.objects.filter(related_id__in=book_ids).values_list('book_id', flat=True)
+    )
+    builder = RelatedBooksBuilder(use_purchases=use_purchases)
+    results = builder.compute(sorted(book_ids))
+
+    # the new neighbours are the books most likely to want the changed ones back
+    neighbours = {related_id for rows in results.values() for related_id, _ in rows} - book_ids
+    results.update(builder.compute(sorted(neighbours)))
+    return builder.store(results)
+
+
+def rebuild_related_books(batch_size=100, use_purchases=True):
+
+    builder = RelatedBooksBuilder(use_purchases=use_purchases)
+    RelatedBook.objects.all().delete()
+
+    total_books = total_rows = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Book.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            break
+        total_rows += builder.store(builder.compute(batch))
+        total_books += len(batch)
+        last_pk = batch[-1]
+    transaction.on_commit(page_cache.invalidate)
+    return total_books, total_rows
@@ -0,0 +1,231 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Book
+
+
+SEARCH_TABLE = 'bookstore_book_search'
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def get_search_limit():
+
+    return getattr(settings, 'BOOKSTORE_SEARCH_LIMIT', 500)
+
+
+def tokenize(query):
+
+    return TERM_RE.findall(query.lower())
+
+
+def _book_document(book):
+
+    return {
+        'title': book.title,
+        'authors': book.authors_display,
+        'description': book.description,
+        'isbn': book.isbn or '',
+    }
+
+
+class SQLiteSearchBackend:
+
+    def match_expression(self, terms):
+
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search_ids(self, query, limit):
+
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+                f"ORDER BY bm25({SEARCH_TABLE}, 10.0, 5.0, 1.0, 10.0) LIMIT %s",
+                [self.match_expression(terms), limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def index_books(self, books):
+
+        rows = []
+        for book in books:
+            document = _book_document(book)
+            rows.append((book.pk, document['title'], document['authors'],
+                         document['description'], document['isbn']))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(row[0],) for row in rows]
+            )
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, authors, description, isbn) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                rows
+            )
+
+    def remove_books(self, book_ids):
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(pk,) for pk in book_ids]
+            )
+
+    def clear(self):
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    def optimize(self):
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+class PostgreSQLSearchBackend:
+
+    config = 'simple'
+
+    def tsquery(self, terms):
+
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def search_ids(self, query, limit):
+
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT book_id FROM {SEARCH_TABLE}, to_tsquery(%s, %s) query "
+                f"WHERE document @@ query ORDER BY ts_rank(document, query) DESC LIMIT %s",
+                [self.config, self.tsquery(terms), limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def index_books(self, books):
+
+        rows = []
+        for book in books:
+            document = _book_document(book)
+            rows.append((book.pk, self.config, document['title'], self.config, document['isbn'],
+                         self.config, document['authors'], self.config, document['description']))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (book_id, document) VALUES (%s, "
+                f"setweight(to_tsvector(%s, %s), 'A') || setweight(to_tsvector(%s, %s), 'A') || "
+                f"setweight(to_tsvector(%s, %s), 'B') || setweight(to_tsvector(%s, %s), 'D')) "
+                f"ON CONFLICT (book_id) DO UPDATE SET document = EXCLUDED.document",
+                rows
+            )
+
+    def remove_books(self, book_ids):
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE book_id = ANY(%s)", [list(book_ids)])
+
+    def clear(self):
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {SEARCH_TABLE}")
+
+    def optimize(self):
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {SEARCH_TABLE}")
+
+
+class FallbackSearchBackend:
+
+    def search_ids(self, query, limit):
+
+        return list(
+            Book.objects.filter(
+                Q(title__icontains=query) |
+                Q(authors__first_name__icontains=query) |
+                Q(authors__last_name__icontains=query) |
+                Q(isbn__icontains=query)
+            ).distinct().values_list('pk', flat=True)[:limit]
+        )
+
+    def index_books(self, books):
+        pass
+
+    def remove_books(self, book_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def optimize(self):
+        pass
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_backend():
+
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)()
+
+
+def search_books(queryset, query):
+
+    ids = get_backend().search_ids(query, get_search_limit())
+    if not ids:
+        return queryset.none()
+
+    ranking = Case(
+        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+        output_field=IntegerField()
+    )
+    return queryset.filter(pk__in=ids).annotate(search_rank=ranking).order_by('search_rank')
+
+
+def index_books(book_ids):
+
+    book_ids = list(book_ids)
+    if not book_ids:
+        return
+    books = Book.objects.filter(pk__in=book_ids)
+    backend = get_backend()
+    backend.index_books(books)
+
+    missing = set(book_ids) - {book.pk for book in books}
+    if missing:
+        backend.remove_books(missing)
+
+
+def remove_books(book_ids):
+
+    get_backend().remove_books(list(book_ids))
+
+
+def rebuild_index(batch_size=1000):
+
+    backend = get_backend()
+    backend.clear()
+
+    total = 0
+    last_pk = 0
+    while True:
+        batch = list(Book.objects.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not batch:
+            break
+        backend.index_books(batch)
+        total += len(batch)
+        last_pk = batch[-1].pk
+
+    backend.optimize()
+    return total
@@ -0,0 +1,223 @@
+import datetime
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import book_counts, page_cache, search
+from .models import Author, Book, Cart, CartItem, Genre, Order, OrderItem, Publisher, UserProfile
+
+
+FIRST_NAMES = ['Тарас', 'Леся', 'Іван', 'Ольга', 'Михайло', 'Ліна', 'Василь', 'Марко', 'Софія',
+               'Андрій', 'Оксана', 'Юрій', 'Марія', 'Сергій', 'Катерина', 'Богдан', 'Ірина', 'Павло']
+LAST_NAMES = ['Шевченко', 'Українка', 'Франко', 'Кобилянська', 'Коцюбинський', 'Костенко', 'Стефаник',
+              'Вовчок', 'Жадан', 'Андрухович', 'Забужко', 'Винничук', 'Дочинець', 'Кідрук', 'Матіос',
+              'Малярчук', 'Прохасько', 'Любка', 'Бабкіна', 'Карпа']
+TITLE_ADJECTIVES = ['Тіні', 'Лісова', 'Зачарована', 'Інтернат', 'Тигролови', 'Місто', 'Чорна', 'Сад',
+                    'Осінні', 'Солодка', 'Останні', 'Кам\'яний', 'Вогняна', 'Тиха', 'Далека', 'Біла']
+TITLE_NOUNS = ['пісня', 'рада', 'ріка', 'дорога', 'ніч', 'гора', 'зима', 'весна', 'пам\'ять', 'тиша',
+               'історія', 'легенда', 'земля', 'хроніка', 'казка', 'вітер']
+GENRE_NAMES = ['Класика', 'Поезія', 'Фантастика', 'Детектив', 'Історія', 'Біографія', 'Дитяча', 'Наука',
+               'Пригоди', 'Драма', 'Філософія', 'Психологія', 'Бізнес', 'Фентезі', 'Горор', 'Гумор']
+CITIES = ['Київ', 'Львів', 'Харків', 'Одеса', 'Дніпро', 'Вінниця', 'Полтава', 'Чернівці']
+LANGUAGES = ['Українська'] * 8 + ['Англійська', 'Польська']
+
+
+def _batches(total, size):
+
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class CatalogSeeder:
+    """
+    Генерує синтетичний каталог для навантажувальних тестів. Усі випадкові
+    значення походять з одного random.Random(seed), тож однаковий seed на
+    порожній базі дає однакові дані.
+    """
+
+    def __init__(self, seed=42, batch_size=5000, on_progress=None):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.on_progress = on_progress or (lambda stage, done, total: None)
+        self.password = make_password('bench-password')
+        self.stats = {}
+
+    def run(self, publishers=0, genres=0, authors=0, books=0, users=0, orders=0):
+
+        started = time.monotonic()
+        self.publishers(publishers)
+        self.genres(genres)
+        self.authors(authors)
+        self.books(books)
+        self.users(users)
+        self.orders(orders)
+        book_counts.reconcile()
+        page_cache.invalidate()
+        self.stats['elapsed'] = time.monotonic() - started
+        return self.stats
+
+    def _timed(self, stage, total, create_batch):
+
+        started = time.monotonic()
+        for start, size in _batches(total, self.batch_size):
+            with transaction.atomic():
+                create_batch(start, size)
+            self.on_progress(stage, start + size, total)
+        self.stats[stage] = {'rows': total, 'seconds': round(time.monotonic() - started, 2)}
+
+    def publishers(self, total):
+
+        offset = Publisher.objects.count()
+        self._timed('publishers', total, lambda start, size: Publisher.objects.bulk_create([
+            Publisher(name=f'Видавництво {offset + start + i + 1}', description='Синтетичне видавництво')
+            for i in range(size)
+        ]))
+
+    def genres(self, total):
+
+        offset = Genre.objects.count()
+
+        def create(start, size):
+            rows = []
+            for i in range(offset + start, offset + start + size):
+                base = GENRE_NAMES[i % len(GENRE_NAMES)]
+                suffix = i // len(GENRE_NAMES)
+                rows.append(Genre(name=f'{base} {suffix}' if suffix else base, slug=f'genre-{i + 1}'))
+            Genre.objects.bulk_create(rows, ignore_conflicts=True)
+
+        self._timed('genres', total, create)
+
+    def authors(self, total):
+
+        self._timed('authors', total, lambda start, size: Author.objects.bulk_create([
+            Author(
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                birth_date=datetime.date(1800, 1, 1) + datetime.timedelta(days=self.random.randrange(80000)),
+            )
+            for _ in range(size)
+        ]))
+
+    def _skewed(self, items):
+
+        # a few popular authors and genres get most of the books; dict.fromkeys
+        # below dedupes in draw order so the same seed gives the same links
+        return items[int(len(items) * self.random.random() ** 3)]
+
+    def books(self, total):
+
+        authors = list(Author.objects.order_by('pk').values_list('pk', 'first_name', 'last_name'))
+        genre_ids = list(Genre.objects.order_by('pk').values_list('pk', flat=True))
+        publisher_ids = list(Publisher.objects.order_by('pk').values_list('pk', flat=True))
+        if total and not (authors and genre_ids and publisher_ids):
+            raise ValueError("Спершу потрібні автори, жанри й видавництва.")
+        isbn_offset = Book.objects.count()
+        backend = search.get_backend()
+
+        def create(start, size):
+            rows, links = [], []
+            for i in range(size):
+                book_authors = dict.fromkeys(self._skewed(authors) for _ in range(self.random.choice((1, 1, 1, 2, 3))))
+                book_genres = dict.fromkeys(self._skewed(genre_ids) for _ in range(self.random.choice((1, 2, 2, 3))))
+                book = Book(
+                    title=f'{self.random.choice(TITLE_ADJECTIVES)} {self.random.choice(TITLE_NOUNS)}',
+                    isbn=f'979{isbn_offset + start + i:010d}',
+                    publisher_id=self.random.choice(publisher_ids),
+                    authors_display=', '.join(
+                        f'{first} {last}' for _, first, last in sorted(book_authors, key=lambda a: (a[2], a[1], a[0]))
+                    ),
+                    description='Синтетичний опис книги для навантажувального тесту.',
+                    pages=self.random.randint(48, 960),
+                    language=self.random.choice(LANGUAGES),
+                    price=Decimal(self.random.randint(5000, 150000)) / 100,
+                    discount=self.random.choice((0, 0, 0, 0, 5, 10, 15, 20, 30)),
+                    publication_date=datetime.date(1900, 1, 1) + datetime.timedelta(days=self.random.randrange(45000)),
+                    stock=0 if self.random.random() < 0.2 else self.random.randint(1, 200),
+                    views=int(self.random.paretovariate(1.2)) - 1,
+                )
+                rows.append(book)
+                links.append(([pk for pk, _, _ in book_authors], book_genres))
+
+            Book.objects.bulk_create(rows)
+            Book.authors.through.objects.bulk_create([
+                Book.authors.through(book_id=book.pk, author_id=author_id)
+                for book, (author_ids, _) in zip(rows, links) for author_id in author_ids
+            ])
+            Book.genres.through.objects.bulk_create([
+                Book.genres.through(book_id=book.pk, genre_id=genre_id)
+                for book, (_, book_genres) in zip(rows, links) for genre_id in book_genres
+            ])
+            backend.index_books(rows)
+
+        self._timed('books', total, create)
+
+    def users(self, total):
+
+        offset = User.objects.count()
+
+        def create(start, size):
+            users = User.objects.bulk_create([
+                User(username=f'reader{offset + start + i + 1}', email=f'reader{offset + start + i + 1}@example.com',
+                     password=self.password)
+                for i in range(size)
+            ])
+            UserProfile.objects.bulk_create([
+                UserProfile(user=user, city=self.random.choice(CITIES), phone='+380501234567') for user in users
+            ])
+            carts = Cart.objects.bulk_create([Cart(user=user) for user in users])
+            self._fill_carts(carts)
+
+        self._timed('users', total, create)
+
+    def _in_stock_books(self):
+
+        if not hasattr(self, '_book_prices'):
+            self._book_prices = list(Book.objects.filter(stock__gt=0).order_by('pk').values_list('pk', 'price'))
+        return self._book_prices
+
+    def _fill_carts(self, carts):
+
+        books = self._in_stock_books()
+        if not books:
+            return
+        items = []
+        for cart in carts:
+            if self.random.random() < 0.3:
+                picked = dict.fromkeys(self.random.choice(books)[0] for _ in range(self.random.randint(1, 5)))
+                items += [CartItem(cart=cart, book_id=pk, quantity=self.random.randint(1, 3)) for pk in picked]
+        CartItem.objects.bulk_create(items)
+
+    def orders(self, total):
+
+        user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+        books = self._in_stock_books()
+        if total and not (user_ids and books):
+            raise ValueError("Спершу потрібні користувачі й книги в наявності.")
+        statuses = [status for status, _ in Order.STATUS_CHOICES]
+
+        def create(start, size):
+            orders, lines = [], []
+            for _ in range(size):
+                picked = dict.fromkeys(self.random.choice(books) for _ in range(self.random.randint(1, 4)))
+                order_lines = [(pk, price, self.random.randint(1, 3)) for pk, price in picked]
+                lines.append(order_lines)
+                orders.append(Order(
+                    user_id=self.random.choice(user_ids),
+                    status=self.random.choice(statuses),
+                    total_price=sum(price * quantity for _, price, quantity in order_lines),
+                    delivery_address='вул. Хрещатик, 1',
+                    delivery_city=self.random.choice(CITIES),
+                    delivery_postal_code='01001',
+                    phone='+380501234567',
+                ))
+            Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, book_id=pk, price=price, quantity=quantity)
+                for order, order_lines in zip(orders, lines) for pk, price, quantity in order_lines
+            ])
+
+        self._timed('orders', total, create)
@@ -0,0 +1,221 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import book_counts, page_cache, related, search, thumbnails
+from .suggest import suggest_index
+from .models import Author, Book, Genre, Publisher, UserProfile
+
+
+def authors_changed(book_ids):
+
+    book_ids = list(book_ids)
+    displays = Book.refresh_authors_display(book_ids)
+    search.index_books(book_ids)
+    related.refresh_related_books(book_ids)
+    return displays
+
+
+@receiver(post_save, sender=Book)
+def book_saved(sender, instance, raw=False, **kwargs):
+
+    if raw:
+        return
+    search.index_books([instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+
+    search.remove_books([instance.pk])
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+def book_authors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+
+    # author.books.clear() does not pass pk_set, so remember the books first
+    if action == 'pre_clear' and reverse:
+        instance._cleared_book_ids = list(instance.books.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        instance.authors_display = authors_changed([instance.pk])[instance.pk]
+    elif action == 'post_clear':
+        authors_changed(getattr(instance, '_cleared_book_ids', []))
+    else:
+        authors_changed(pk_set or [])
+
+
+@receiver(m2m_changed, sender=Book.genres.through)
+def book_genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+
+    if action == 'pre_clear' and reverse:
+        instance._cleared_book_ids = list(instance.books.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        book_ids = [instance.pk]
+    elif action == 'post_clear':
+        book_ids = getattr(instance, '_cleared_book_ids', [])
+    else:
+        book_ids = list(pk_set or [])
+
+    # pages validated by Book.updated_at list the genres too
+    Book.objects.filter(pk__in=book_ids).update(updated_at=timezone.now())
+    related.refresh_related_books(book_ids)
+
+
+@receiver(post_save, sender=Author)
+def author_saved(sender, instance, created, raw=False, **kwargs):
+
+    if raw or created:
+        return
+    authors_changed(instance.books.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Author)
+def author_deleting(sender, instance, **kwargs):
+
+    instance._deleted_book_ids = list(instance.books.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Author)
+def author_deleted(sender, instance, **kwargs):
+
+    authors_changed(getattr(instance, '_deleted_book_ids', []))
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Publisher)
+@receiver(post_save, sender=UserProfile)
+def image_saved(sender, instance, raw=False, **kwargs):
+
+    if raw:
+        return
+    for label, field_name in thumbnails.IMAGE_FIELDS:
+        if label == sender._meta.label:
+            fieldfile = getattr(instance, field_name)
+            if thumbnails.needs_variants(fieldfile):
+                thumbnails.schedule(fieldfile)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Publisher)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Publisher)
+@receiver(post_delete, sender=Genre)
+@receiver(m2m_changed, sender=Book.authors.through)
+@receiver(m2m_changed, sender=Book.genres.through)
+def catalog_changed(sender, raw=False, action=None, **kwargs):
+
+    if raw or action not in (None, 'post_add', 'post_remove', 'post_clear'):
+        return
+    page_cache.invalidate()
+
+
+@receiver(pre_save, sender=Book)
+def book_saving(sender, instance, raw=False, **kwargs):
+
+    instance._counted_state = None
+    if not raw and instance.pk is not None:
+        instance._counted_state = Book.objects.filter(pk=instance.pk).values_list('stock', 'publisher_id').first()
+
+
+@receiver(post_save, sender=Book)
+def book_counts_saved(sender, instance, raw=False, **kwargs):
+
+    if raw:
+        return
+    state = getattr(instance, '_counted_state', None)
+    if state is None:
+        # a new book has no genres or authors yet
+        book_counts.recount(Publisher, [instance.publisher_id])
+        return
+
+    old_stock, old_publisher_id = state
+    if (old_stock > 0) != (instance.stock > 0):
+        book_counts.recount_books([instance.pk])
+    if old_publisher_id != instance.publisher_id:
+        book_counts.recount(Publisher, [old_publisher_id, instance.publisher_id])
+
+
+@receiver(pre_delete, sender=Book)
+def book_counts_deleting(sender, instance, **kwargs):
+
+    instance._counted_lookups = book_counts.book_lookups([instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def book_counts_deleted(sender, instance, **kwargs):
+
+    book_counts.recount_lookups(getattr(instance, '_counted_lookups', {}))
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+@receiver(m2m_changed, sender=Book.genres.through)
+def book_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+
+    if sender is Book.genres.through:
+        model, field_name = Genre, 'genres'
+    else:
+        model, field_name = Author, 'authors'
+
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_lookup_ids = list(getattr(instance, field_name).values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        ids = [instance.pk]
+    elif action == 'post_clear':
+        ids = getattr(instance, '_cleared_lookup_ids', [])
+    else:
+        ids = pk_set or []
+    book_counts.recount(model, ids)
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Publisher)
+@receiver(post_save, sender=Genre)
+def lookup_counts_saved(sender, instance, created, raw=False, **kwargs):
+
+    # saving a stale instance writes its old counters back
+    if not raw and not created:
+        book_counts.recount(sender, [instance.pk])
+
+
+@receiver(post_save, sender=Book)
+def suggest_book_saved(sender, instance, raw=False, **kwargs):
+
+    if not raw:
+        suggest_index.update_book(instance)
+
+
+@receiver(post_delete, sender=Book)
+def suggest_book_deleted(sender, instance, **kwargs):
+
+    suggest_index.remove_book(instance.pk)
+
+
+@receiver(post_save, sender=Author)
+def suggest_author_saved(sender, instance, raw=False, **kwargs):
+
+    if not raw:
+        suggest_index.update_author(instance)
+
+
+@receiver(post_delete, sender=Author)
+def suggest_author_deleted(sender, instance, **kwargs):
+
+    suggest_index.remove_author(instance.pk)
@@ -0,0 +1,385 @@
+import bisect
+import functools
+import heapq
+import logging
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.urls import get_script_prefix, reverse
+
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r'\w+')
+
+MAX_LIMIT = 20
+# precomputed tops keep spare results so that removing one rarely needs a rescan
+TOP_SIZE = 2 * MAX_LIMIT
+# prefixes matching more entries than this get their top results precomputed,
+# shorter ranges are ranked on the fly
+SCAN_LIMIT = 256
+# also match from the start of each of the first words: "пісня" finds "Лісова пісня"
+MAX_WORD_OFFSETS = 6
+
+
+def normalize(text):
+
+    return ' '.join(WORD_RE.findall(text.casefold()))
+
+
+def normalize_isbn(text):
+
+    return re.sub(r'[\s-]', '', text)
+
+
+@functools.lru_cache
+def detail_url(kind, script_prefix):
+
+    # reverse() costs more than the whole index lookup, so format the detail URL from a template
+    head, tail = reverse(f'bookstore:{kind}_detail', args=[0]).rsplit('0', 1)
+    return head.replace('{', '{{').replace('}', '}}') + '{}' + tail
+
+
+class PrefixIndex:
+    """
+    Відсортований масив входжень (слот, зсув) для пошуку за префіксом.
+    Ключ входження — нормалізований текст слота від зсуву, він обчислюється
+    під час бінарного пошуку й не зберігається, тож у пам'яті лишаються лише
+    мітки, масиви чисел і готові топи для префіксів з великою кількістю входжень.
+    """
+
+    def __init__(self, word_offsets=True, normalizer=normalize):
+        self.word_offsets = word_offsets
+        self.normalizer = normalizer
+        self.labels = []
+        self.scores = array('q')
+        self.pks = array('q')
+        self.slot_of = array('l')
+        self.entries = array('Q')
+        self.top = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _text(self, slot):
+        return self.normalizer(self.labels[slot])
+
+    def _key(self, entry):
+        return self._text(entry >> 16)[entry & 0xFFFF:]
+
+    def _offsets(self, text):
+
+        if not text:
+            return []
+        if not self.word_offsets:
+            return [0]
+        offsets = [0] + [match.start() + 1 for match in re.finditer(' ', text)]
+        return [offset for offset in offsets[:MAX_WORD_OFFSETS] if offset <= 0xFFFF]
+
+    def _entries(self, slot):
+
+        return [slot << 16 | offset for offset in self._offsets(self._text(slot))]
+
+    def _set_slot(self, pk, label, score):
+
+        if pk >= len(self.slot_of):
+            self.slot_of.extend([-1] * (pk + 1 - len(self.slot_of)))
+        slot = self.slot_of[pk]
+        if slot == -1:
+            slot = len(self.labels)
+            self.labels.append(label)
+            self.scores.append(score)
+            self.pks.append(pk)
+            self.slot_of[pk] = slot
+        else:
+            self.labels[slot] = label
+            self.scores[slot] = score
+        return slot
+
+    def build(self, rows):
+        """rows — ітератор (pk, мітка, популярність)."""
+
+        buckets = defaultdict(list)
+        for pk, label, score in rows:
+            slot = self._set_slot(pk, label, score)
+            text = self._text(slot)
+            for offset in self._offsets(text):
+                buckets[text[offset]].append(slot << 16 | offset)
+
+        # sorting bucket by bucket keeps only one bucket's keys in memory at a time
+        for first in sorted(buckets):
+            self.entries.extend(sorted(buckets.pop(first), key=self._key))
+        self._build_top()
+
+    def _range(self, prefix):
+
+        lo = bisect.bisect_left(self.entries, prefix, key=self._key)
+        hi = bisect.bisect_left(self.entries, prefix + '\U0010ffff', lo, key=self._key)
+        return lo, hi
+
+    def _best(self, slots, limit):
+
+        best, seen = [], set()
+        for slot in sorted(set(slots), key=lambda slot: (-self.scores[slot], self.pks[slot])):
+            label = self.labels[slot]
+            if label is None or label.casefold() in seen:
+                continue
+            seen.add(label.casefold())
+            best.append(slot)
+            if len(best) == limit:
+                break
+        return tuple(best)
+
+    def _build_top(self):
+
+        self.top = {}
+        pending = [('', 0, len(self.entries))]
+        while pending:
+            parent, lo, hi = pending.pop()
+            length = len(parent) + 1
+            start = lo
+            while start < hi:
+                key = self._key(self.entries[start])
+                if len(key) < length:
+                    start += 1
+                    continue
+                prefix = key[:length]
+                end = bisect.bisect_left(self.entries, prefix + '\U0010ffff', start, hi, key=self._key)
+                if end - start > SCAN_LIMIT:
+                    self.top[prefix] = self._best((entry >> 16 for entry in self.entries[start:end]), TOP_SIZE)
+                    pending.append((prefix, start, end))
+                start = end
+
+    def _refresh_top(self, removed, added, slot):
+
+        for prefix in removed - added:
+            current = self.top.get(prefix)
+            if current is None or slot not in current:
+                continue
+            current = tuple(other for other in current if other != slot)
+            if len(current) < MAX_LIMIT:
+                lo, hi = self._range(prefix)
+                current = self._best((entry >> 16 for entry in self.entries[lo:hi]), TOP_SIZE)
+            self.top[prefix] = current
+
+        for prefix in added:
+            current = self.top.get(prefix)
+            if current is not None:
+                self.top[prefix] = self._best(current + (slot,), TOP_SIZE)
+
+    def _prefixes(self, slot):
+
+        text = self._text(slot)
+        return {text[offset:end] for offset in self._offsets(text) for end in range(offset + 1, len(text) + 1)}
+
+    def _remove_entries(self, slot):
+
+        for entry in self._entries(slot):
+            lo, hi = self._range(self._key(entry))
+            for position in range(lo, hi):
+                if self.entries[position] == entry:
+                    del self.entries[position]
+                    break
+
+    def update(self, pk, label, score=None):
+
+        slot = self.slot_of[pk] if pk < len(self.slot_of) else -1
+        stale = set()
+        if slot != -1 and self.labels[slot] is not None:
+            stale = self._prefixes(slot)
+            self._remove_entries(slot)
+            if score is None:
+                score = self.scores[slot]
+        slot = self._set_slot(pk, label, score or 0)
+        for entry in self._entries(slot):
+            bisect.insort(self.entries, entry, key=self._key)
+        self._refresh_top(stale, self._prefixes(slot), slot)
+
+    def remove(self, pk):
+
+        slot = self.slot_of[pk] if pk < len(self.slot_of) else -1
+        if slot == -1 or self.labels[slot] is None:
+            return
+        stale = self._prefixes(slot)
+        self._remove_entries(slot)
+        self.labels[slot] = None
+        self.slot_of[pk] = -1
+        self._refresh_top(stale, set(), slot)
+
+    def search(self, prefix, limit):
+        """Найпопулярніші слоти, що мають слово з префіксом `prefix`."""
+
+        top = self.top.get(prefix)
+        if top is None:
+            lo, hi = self._range(prefix)
+            top = self._best((entry >> 16 for entry in self.entries[lo:hi]), limit)
+        return top[:limit]
+
+    def label(self, pk):
+
+        slot = self.slot_of[pk] if pk < len(self.slot_of) else -1
+        return None if slot == -1 else self.labels[slot]
+
+    def memory_usage(self):
+
+        sizes = [sys.getsizeof(self.labels), sys.getsizeof(self.top)]
+        sizes += [array_.buffer_info()[1] * array_.itemsize
+                  for array_ in (self.scores, self.pks, self.slot_of, self.entries)]
+        sizes += [sys.getsizeof(label) for label in self.labels if label is not None]
+        sizes += [sys.getsizeof(key) + sys.getsizeof(slots) for key, slots in self.top.items()]
+        return sum(sizes)
+
+
+class SuggestIndex:
+    """
+    Підказки для пошуку в пам'яті процесу: назви книг, імена авторів і ISBN.
+    Індекс будується при першому запиті, оновлюється сигналами моделей у цьому
+    процесі й повністю перебудовується у фоні, коли старший за
+    BOOKSTORE_SUGGEST_MAX_AGE (зміни з інших процесів і queryset.update()).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rebuilding = False
+        self.reset()
+
+    def reset(self):
+
+        with self._lock:
+            self.books = self.authors = self.isbns = None
+            self.built_at = None
+            self.build_seconds = None
+
+    @property
+    def is_built(self):
+        return self.books is not None
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'BOOKSTORE_SUGGEST_MAX_AGE', 600)
+
+    def build(self):
+
+        from .models import Author, Book
+
+        started = time.monotonic()
+        books, authors, isbns = PrefixIndex(), PrefixIndex(), PrefixIndex(word_offsets=False, normalizer=normalize_isbn)
+        rows = Book.objects.order_by('pk').values_list('pk', 'title', 'views', 'isbn')
+        books.build((pk, title, views) for pk, title, views, isbn in rows.iterator(chunk_size=10000))
+        isbns.build((pk, isbn, views) for pk, title, views, isbn in rows.iterator(chunk_size=10000) if isbn)
+        authors.build(
+            (pk, f'{first_name} {last_name}'.strip(), score)
+            for pk, first_name, last_name, score in Author.objects.order_by('pk').annotate(
+                score=Coalesce(Sum('books__views'), 0)
+            ).values_list('pk', 'first_name', 'last_name', 'score').iterator(chunk_size=10000)
+        )
+        with self._lock:
+            self.books, self.authors, self.isbns = books, authors, isbns
+            self.built_at = time.monotonic()
+            self.build_seconds = self.built_at - started
+
+    def ensure_built(self):
+
+        if not self.is_built:
+            with self._lock:
+                if not self.is_built:
+                    self.build()
+        elif self.max_age and time.monotonic() - self.built_at > self.max_age:
+            self._rebuild_in_background()
+
+    def _rebuild_in_background(self):
+
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.build()
+            except Exception:
+                logger.exception("Не вдалося перебудувати індекс підказок")
+            finally:
+                self._rebuilding = False
+                close_old_connections()
+
+        threading.Thread(target=run, name='suggest-index-rebuild', daemon=True).start()
+
+    def suggest(self, query, limit=8):
+
+        limit = max(1, min(limit, MAX_LIMIT))
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self.ensure_built()
+
+        with self._lock:
+            found = [(self.books.scores[slot], 'book', self.books.pks[slot], self.books.labels[slot])
+                     for slot in self.books.search(prefix, limit)]
+            found += [(self.authors.scores[slot], 'author', self.authors.pks[slot], self.authors.labels[slot])
+                      for slot in self.authors.search(prefix, limit)]
+            isbn = normalize_isbn(query)
+            if isbn.isdigit():
+                found += [(self.isbns.scores[slot], 'book', self.isbns.pks[slot],
+                           self.books.label(self.isbns.pks[slot]))
+                          for slot in self.isbns.search(isbn, limit)]
+
+        suggestions, seen = [], set()
+        for score, kind, pk, label in heapq.nlargest(len(found), found, key=lambda item: item[0]):
+            if (kind, pk) in seen or label is None:
+                continue
+            seen.add((kind, pk))
+            suggestions.append({
+                'type': kind,
+                'label': label,
+                'url': detail_url(kind, get_script_prefix()).format(pk),
+            })
+            if len(suggestions) == limit:
+                break
+        return suggestions
+
+    def update_book(self, book):
+
+        with self._lock:
+            if not self.is_built:
+                return
+            self.books.update(book.pk, book.title, book.views)
+            self.isbns.remove(book.pk)
+            if book.isbn:
+                self.isbns.update(book.pk, book.isbn, book.views)
+
+    def remove_book(self, pk):
+
+        with self._lock:
+            if self.is_built:
+                self.books.remove(pk)
+                self.isbns.remove(pk)
+
+    def update_author(self, author):
+
+        with self._lock:
+            if self.is_built:
+                self.authors.update(author.pk, f'{author.first_name} {author.last_name}'.strip())
+
+    def remove_author(self, pk):
+
+        with self._lock:
+            if self.is_built:
+                self.authors.remove(pk)
+
+    def memory_usage(self):
+
+        if not self.is_built:
+            return 0
+        return sum(index.memory_usage() for index in (self.books, self.authors, self.isbns))
+
+
+suggest_index = SuggestIndex()
@@ -0,0 +1,19 @@
+from django import template
+
+from bookstore import thumbnails
+
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(fieldfile, label):
+    """{{ book.cover_image|thumbnail:'card' }} — URL варіанта або оригіналу, поки варіант не готовий."""
+
+    return thumbnails.thumbnail_url(fieldfile, label)
+
+
+@register.filter
+def srcset(fieldfile):
+
+    return thumbnails.srcset(fieldfile)
@@ -0,0 +1,27 @@
+import pytest
+from bookstore.counters import view_counter
+from bookstore.suggest import suggest_index
+
+
+@pytest.fixture(autouse=True)
+def synchronous_view_counter(settings):
+
+    settings.BOOKSTORE_VIEWS_FLUSH_INTERVAL = 0
+    view_counter._pending.clear()
+    yield
+    view_counter._pending.clear()
+
+
+@pytest.fixture(autouse=True)
+def no_page_cache(settings):
+
+    # most tests change books with queryset.update(), which sends no signals
+    settings.BOOKSTORE_PAGE_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture(autouse=True)
+def fresh_suggest_index():
+
+    suggest_index.reset()
+    yield
+    suggest_index.reset()
@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookstore.models import Book, Author, Publisher, Cart, CartItem
+
+
+@pytest.fixture
+def admin_client(client, db):
+
+    client.force_login(User.objects.create_superuser(username='admin', password='secret-pass-1'))
+    return client
+
+
+@pytest.fixture
+def publisher(db):
+
+    return Publisher.objects.create(name='Видавництво')
+
+
+def make_books(publisher, count, start=0, **fields):
+
+    books = []
+    for i in range(start, start + count):
+        book = Book.objects.create(
+            title=f'Книга {i}', publisher=publisher, isbn=f'{i:013d}', description='Опис',
+            pages=100, price=100, publication_date='2024-01-01', stock=i % 3, **fields
+        )
+        book.authors.add(Author.objects.create(first_name='Автор', last_name=f'Прізвище {i}'))
+        books.append(book)
+    return books
+
+
+def count_queries(client, url, **params):
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestAdminChangelists:
+
+    def test_book_changelist_queries_do_not_grow(self, admin_client, publisher):
+
+        url = reverse('admin:bookstore_book_changelist')
+        make_books(publisher, 3)
+        admin_client.get(url)
+        small = count_queries(admin_client, url)
+        make_books(publisher, 20, start=3)
+        assert count_queries(admin_client, url) == small
+
+    def test_count_is_capped(self, admin_client, publisher, settings):
+
+        settings.BOOKSTORE_ADMIN_COUNT_LIMIT = 5
+        make_books(publisher, 8)
+
+        response = admin_client.get(reverse('admin:bookstore_book_changelist'))
+        assert response.context['cl'].result_count == 5
+        assert response.context['cl'].full_result_count is None
+
+    def test_search_uses_full_text_index(self, admin_client, publisher):
+
+        books = make_books(publisher, 3)
+        Book.objects.filter(pk=books[1].pk).update(stock=0)
+
+        response = admin_client.get(reverse('admin:bookstore_book_changelist'), {'q': 'прізвище 1'})
+        assert list(response.context['cl'].result_list) == [books[1]]
+
+    def test_cart_totals_are_annotated(self, admin_client, publisher):
+
+        first, second = make_books(publisher, 2, discount=10)
+        url = reverse('admin:bookstore_cart_changelist')
+        Cart.objects.create(user=User.objects.create_user(username='empty', password='secret-pass-1'))
+        admin_client.get(url)
+        small = count_queries(admin_client, url)
+
+        for name in ('reader', 'buyer'):
+            cart = Cart.objects.create(user=User.objects.create_user(username=name, password='secret-pass-1'))
+            CartItem.objects.create(cart=cart, book=first, quantity=2)
+            CartItem.objects.create(cart=cart, book=second, quantity=1)
+        assert count_queries(admin_client, url) == small
+
+        response = admin_client.get(url)
+        rows = {cart.user.username: cart for cart in response.context['cl'].result_list}
+        admin = response.context['cl'].model_admin
+        assert admin.total_items(rows['reader']) == 3
+        assert admin.total_price(rows['reader']) == Decimal('270.00') == rows['reader'].total_price
+        assert admin.total_price(rows['empty']) == Decimal('0.00')
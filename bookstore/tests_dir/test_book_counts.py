@@ -0,0 +1,112 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from bookstore.models import Book, Author, Publisher, Genre, Cart, CartItem, Order
+from bookstore.orders import place_order
+
+
+@pytest.fixture
+def catalog(db):
+
+    publisher = Publisher.objects.create(name='Видавництво')
+    author = Author.objects.create(first_name='Тарас', last_name='Шевченко')
+    poetry = Genre.objects.create(name='Поезія', slug='poetry')
+    classics = Genre.objects.create(name='Класика', slug='classics')
+    return {'publisher': publisher, 'author': author, 'poetry': poetry, 'classics': classics}
+
+
+def make_book(catalog, title='Кобзар', stock=5):
+
+    book = Book.objects.create(
+        title=title, publisher=catalog['publisher'], description='Опис', pages=100,
+        price=100, publication_date='2024-01-01', stock=stock
+    )
+    book.authors.add(catalog['author'])
+    book.genres.add(catalog['poetry'], catalog['classics'])
+    return book
+
+
+def counts(obj):
+
+    obj.refresh_from_db()
+    return obj.book_count, obj.in_stock_book_count
+
+
+@pytest.mark.django_db
+class TestBookCounts:
+
+    def test_counts_follow_links_and_stock(self, catalog):
+
+        book = make_book(catalog)
+        make_book(catalog, title='Гайдамаки', stock=0)
+
+        for name in ('publisher', 'author', 'poetry', 'classics'):
+            assert counts(catalog[name]) == (2, 1)
+
+        book.stock = 0
+        book.save()
+        assert counts(catalog['poetry']) == (2, 0)
+        assert counts(catalog['publisher']) == (2, 0)
+
+        book.genres.remove(catalog['poetry'])
+        assert counts(catalog['poetry']) == (1, 0)
+
+        catalog['classics'].books.clear()
+        assert counts(catalog['classics']) == (0, 0)
+
+    def test_publisher_change_and_delete(self, catalog):
+
+        book = make_book(catalog)
+        other = Publisher.objects.create(name='Фоліо')
+
+        book.publisher = other
+        book.save()
+        assert counts(catalog['publisher']) == (0, 0)
+        assert counts(other) == (1, 1)
+
+        book.delete()
+        assert counts(other) == (0, 0)
+        assert counts(catalog['author']) == (0, 0)
+        assert counts(catalog['poetry']) == (0, 0)
+
+    def test_selling_out_updates_in_stock_counts(self, catalog):
+
+        book = make_book(catalog, stock=2)
+        user = User.objects.create_user(username='buyer', password='secret-pass-1')
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, book=book, quantity=2)
+
+        place_order(Order(user=user, delivery_address='вул. Хрещатик, 1', delivery_city='Київ',
+                          delivery_postal_code='01001', phone='+380501234567'), cart)
+
+        assert counts(catalog['poetry']) == (1, 0)
+        assert counts(catalog['author']) == (1, 0)
+
+    def test_saving_stale_instance_keeps_counts(self, catalog):
+
+        stale = Author.objects.get(pk=catalog['author'].pk)
+        make_book(catalog)
+
+        stale.bio = 'Поет'
+        stale.save()
+        assert counts(catalog['author']) == (1, 1)
+
+    def test_reconcile_repairs_drift(self, catalog):
+
+        make_book(catalog)
+        Genre.objects.update(book_count=7, in_stock_book_count=7)
+
+        out = StringIO()
+        call_command('reconcile_book_counts', stdout=out)
+
+        assert counts(catalog['poetry']) == (1, 1)
+        assert 'Жанри: виправлено 2' in out.getvalue()
+        assert 'Автори: виправлено 0' in out.getvalue()
+
+    def test_popular_genres_use_stored_counts(self, client, catalog):
+
+        make_book(catalog)
+        response = client.get('/')
+        assert list(response.context['popular_genres'])[:2] == [catalog['classics'], catalog['poetry']]
@@ -1,3 +1,9 @@
+import re
+
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from bookstore.models import Book
 from django.contrib.auth.models import User
 from django.urls import reverse
@@ -91,8 +97,15 @@ class TestBookModel:
 
         book.discount = 20
         book.save()
+        book.refresh_from_db()
         assert book.final_price == 80.00
 
+    def test_final_price_is_exact_decimal(self, book):
+
+        Book.objects.filter(pk=book.pk).update(price=Decimal('199.99'), discount=15)
+        book.refresh_from_db()
+        assert book.final_price == Decimal('169.99')
+
     def test_book_not_available_when_out_of_stock(self, book):
 
         book.stock = 0
@@ -102,6 +115,47 @@ class TestBookModel:
 
 
 
+@pytest.mark.django_db
+class TestAuthorsDisplay:
+
+
+    def test_display_set_when_authors_added(self, book):
+
+        assert book.authors_display == 'Тарас Шевченко'
+        book.refresh_from_db()
+        assert book.get_authors_display() == 'Тарас Шевченко'
+
+    def test_display_follows_author_rename(self, book, author):
+
+        author.first_name = 'Т.'
+        author.save()
+
+        book.refresh_from_db()
+        assert book.authors_display == 'Т. Шевченко'
+
+    def test_display_sorted_and_cleared(self, book):
+
+        book.authors.add(Author.objects.create(first_name='Іван', last_name='Франко'))
+        book.refresh_from_db()
+        assert book.authors_display == 'Іван Франко, Тарас Шевченко'
+
+        book.authors.clear()
+        book.refresh_from_db()
+        assert book.authors_display == ''
+
+    def test_index_query_count_does_not_grow(self, client, book, django_assert_max_num_queries):
+
+        for i in range(10):
+            extra = Book.objects.create(
+                title=f'Книга {i}', publisher=book.publisher, description='Опис',
+                pages=100, price=50, publication_date='2024-01-01', stock=3
+            )
+            extra.authors.add(*Author.objects.all())
+
+        with django_assert_max_num_queries(5):
+            client.get(reverse('bookstore:index'))
+
+
 @pytest.mark.django_db
 class TestBookListView:
 
@@ -130,6 +184,54 @@ class TestBookListView:
         assert response.status_code == 200
         assert 'Тестова книга' in response.content.decode()
 
+    def test_sort_and_filter_by_discounted_price(self, client, book, publisher):
+
+        # 150 with 50% off is cheaper than 100 without a discount
+        cheaper = Book.objects.create(
+            title='Зі знижкою', publisher=publisher, description='Опис', pages=100,
+            price=150, discount=50, publication_date='2024-01-01', stock=3
+        )
+        url = reverse('bookstore:book_list')
+
+        response = client.get(url, {'sort_by': 'price_asc'})
+        assert list(response.context['page_obj']) == [cheaper, book]
+
+        response = client.get(url, {'min_price': '80', 'max_price': '100'})
+        assert list(response.context['page_obj']) == [book]
+
+        response = client.get(url, {'max_price': 'дешево'})
+        assert len(response.context['page_obj']) == 2
+
+
+@pytest.mark.django_db
+class TestListingProjections:
+
+    def test_listings_skip_heavy_columns(self, client, book, author, publisher):
+
+        author.bio = 'Поет, ' * 200
+        author.save()
+        urls = [
+            reverse('bookstore:index'), reverse('bookstore:book_list'),
+            reverse('bookstore:author_detail', args=[author.pk]),
+            reverse('bookstore:publisher_detail', args=[publisher.pk]),
+            reverse('bookstore:author_list'), reverse('bookstore:publisher_list'),
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            assert response.status_code == 200
+            sql = ' '.join(query['sql'] for query in queries)
+            # a selected column, not the SUBSTR() excerpt
+            assert not re.search(r'(?<!\()"bookstore_book"\."description"(,| FROM)', sql), url
+            if url != urls[2]:
+                assert not re.search(r'(?<!\()"bookstore_author"\."bio"(,| FROM)', sql), url
+
+        response = client.get(reverse('bookstore:book_list'))
+        assert 'Тестова книга' in response.content.decode()
+        assert 'Тарас Шевченко' in response.content.decode()
+        response = client.get(reverse('bookstore:author_list'))
+        assert 'Поет, Поет,' in response.content.decode()
+
 
 @pytest.mark.django_db
 class TestBookDetailView:
@@ -342,6 +444,56 @@ class TestCartFunctionality:
 
 
 
+@pytest.mark.django_db
+class TestCartTotals:
+
+
+    def test_totals_in_one_query_with_discount(self, user, book, django_assert_num_queries):
+
+        book.price = 101
+        book.discount = 15
+        book.save()
+        cart = Cart.objects.create(user=user)
+        cart.items.create(book=book, quantity=2)
+
+        cart = Cart.objects.get(pk=cart.pk)
+        with django_assert_num_queries(1):
+            assert cart.total_items == 2
+            assert cart.total_price == Decimal('171.70')
+
+    def test_empty_cart_totals(self, user):
+
+        cart = Cart.objects.create(user=user)
+
+        assert cart.total_items == 0
+        assert cart.total_price == 0
+
+    def test_badge_count_cached_in_session(self, client, user, book):
+
+        client.force_login(user)
+        client.get(reverse('bookstore:add_to_cart', kwargs={'pk': book.pk}))
+        response = client.get(reverse('bookstore:about'))
+        assert response.context['cart_items_count'] == 1
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('bookstore:about'))
+
+        assert response.context['cart_items_count'] == 1
+        assert not [q for q in queries.captured_queries if 'bookstore_cart' in q['sql']]
+
+    def test_badge_invalidated_by_cart_changes(self, client, user, book):
+
+        client.force_login(user)
+        client.get(reverse('bookstore:add_to_cart', kwargs={'pk': book.pk}))
+        client.get(reverse('bookstore:add_to_cart', kwargs={'pk': book.pk}))
+        assert client.get(reverse('bookstore:about')).context['cart_items_count'] == 2
+
+        item = Cart.objects.get(user=user).items.get()
+        client.post(reverse('bookstore:remove_from_cart', kwargs={'pk': item.pk}))
+
+        assert client.get(reverse('bookstore:about')).context['cart_items_count'] == 0
+
+
 @pytest.mark.django_db
 class TestUserAuthentication:
 
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import OperationalError, close_old_connections
+from django.urls import reverse
+from bookstore.models import Book, Publisher, Cart, CartItem, Order, OrderItem
+from bookstore.orders import InsufficientStock, place_order
+
+
+CHECKOUT_DATA = {
+    'delivery_address': 'вул. Хрещатик, 1',
+    'delivery_city': 'Київ',
+    'delivery_postal_code': '01001',
+    'phone': '+380501234567',
+}
+
+
+def make_books(count, stock):
+
+    publisher = Publisher.objects.create(name='Видавництво')
+    return [
+        Book.objects.create(
+            title=f'Книга {i}', publisher=publisher, description='Опис', pages=100,
+            price=100, publication_date='2024-01-01', stock=stock
+        )
+        for i in range(count)
+    ]
+
+
+def make_cart(username, books, quantity=1):
+
+    user = User.objects.create_user(username=username, password='testpass123')
+    cart = Cart.objects.create(user=user)
+    CartItem.objects.bulk_create([CartItem(cart=cart, book=book, quantity=quantity) for book in books])
+    return user, cart
+
+
+def new_order(user):
+
+    return Order(user=user, **CHECKOUT_DATA)
+
+
+@pytest.mark.django_db
+class TestCheckout:
+
+
+    def test_checkout_creates_order_and_decrements_stock(self, client):
+
+        books = make_books(3, stock=5)
+        user, cart = make_cart('buyer', books, quantity=2)
+        client.force_login(user)
+
+        response = client.post(reverse('bookstore:checkout'), CHECKOUT_DATA)
+
+        order = Order.objects.get(user=user)
+        assert response.status_code == 302
+        assert order.total_price == 600
+        assert order.items.count() == 3
+        assert list(Book.objects.values_list('stock', flat=True)) == [3, 3, 3]
+        assert not cart.items.exists()
+
+    def test_insufficient_stock_rolls_back(self):
+
+        books = make_books(3, stock=5)
+        Book.objects.filter(pk=books[1].pk).update(stock=1)
+        user, cart = make_cart('buyer', books, quantity=2)
+
+        with pytest.raises(InsufficientStock) as error:
+            place_order(new_order(user), cart)
+
+        assert error.value.book.pk == books[1].pk
+        assert not Order.objects.exists()
+        assert not OrderItem.objects.exists()
+        assert sorted(Book.objects.values_list('stock', flat=True)) == [1, 5, 5]
+        assert cart.items.count() == 3
+
+    def test_query_count_does_not_depend_on_cart_size(self, django_assert_max_num_queries):
+
+        books = make_books(30, stock=5)
+        user, cart = make_cart('buyer', books)
+
+        with django_assert_max_num_queries(8):
+            place_order(new_order(user), cart)
+
+        assert OrderItem.objects.count() == 30
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentCheckout:
+
+
+    def test_parallel_checkouts_never_oversell(self):
+
+        books = make_books(2, stock=5)
+        carts = [make_cart(f'buyer{i}', books, quantity=2) for i in range(8)]
+        results = []
+
+        def checkout(user, cart):
+            try:
+                for _ in range(500):
+                    try:
+                        results.append(place_order(new_order(user), cart))
+                        return
+                    except OperationalError:
+                        # SQLite reports lock contention instead of waiting; try again
+                        time.sleep(0.01)
+            except InsufficientStock:
+                results.append(None)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=checkout, args=cart) for cart in carts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        placed = [order for order in results if order is not None]
+        stocks = list(Book.objects.order_by('pk').values_list('stock', flat=True))
+
+        assert len(results) == len(carts)
+        assert len(placed) == 2
+        assert stocks == [1, 1]
+        assert OrderItem.objects.count() == 2 * len(placed)
+        assert Order.objects.count() == len(placed)
@@ -0,0 +1,117 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from bookstore.models import Book, Author, Publisher, Genre, Cart
+from bookstore.counters import view_counter
+
+
+@pytest.fixture
+def book(db):
+
+    publisher = Publisher.objects.create(name='Видавництво')
+    author = Author.objects.create(first_name='Тарас', last_name='Шевченко')
+    genre = Genre.objects.create(name='Поезія', slug='poetry')
+    book = Book.objects.create(
+        title='Кобзар', publisher=publisher, description='Опис', pages=100,
+        price=100, publication_date='2024-01-01', stock=5
+    )
+    book.authors.add(author)
+    book.genres.add(genre)
+    return book
+
+
+def revalidate(client, url, response, **extra):
+
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **extra)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_book_detail_not_modified(self, client, book, django_assert_max_num_queries):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        first = client.get(url)
+        assert first.status_code == 200
+        assert first.has_header('Last-Modified')
+
+        with django_assert_max_num_queries(2):
+            second = revalidate(client, url, first)
+        assert second.status_code == 304
+        assert not second.content
+        assert view_counter._pending[book.pk] == 2
+
+    def test_book_change_invalidates(self, client, book):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        first = client.get(url)
+
+        book.price = 150
+        book.save()
+        assert revalidate(client, url, first).status_code == 200
+
+        first = client.get(url)
+        book.genres.add(Genre.objects.create(name='Класика', slug='classics'))
+        assert revalidate(client, url, first).status_code == 200
+
+        first = client.get(url)
+        book.publisher.name = 'Нова назва'
+        book.publisher.save()
+        assert revalidate(client, url, first).status_code == 200
+
+    def test_if_modified_since_for_anonymous(self, client, book):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        first = client.get(url)
+
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code == 304
+
+    def test_validators_vary_by_user_and_cart(self, client, book):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        anonymous = client.get(url)
+
+        user = User.objects.create_user(username='reader', password='secret-pass-1')
+        Cart.objects.create(user=user)
+        client.force_login(user)
+        assert revalidate(client, url, anonymous).status_code == 200
+
+        signed_in = client.get(url)
+        assert not signed_in.has_header('Last-Modified')
+        assert revalidate(client, url, signed_in).status_code == 304
+
+        client.post(reverse('bookstore:add_to_cart', args=[book.pk]))
+        # the first request shows the pending flash message, the next one sees the new badge count
+        assert revalidate(client, url, signed_in).status_code == 200
+        assert revalidate(client, url, signed_in).status_code == 200
+
+    def test_book_list_tracks_stock(self, client, book):
+
+        url = reverse('bookstore:book_list')
+        first = client.get(url)
+        assert revalidate(client, url, first).status_code == 304
+
+        Book.objects.filter(pk=book.pk).update(stock=0)
+        assert revalidate(client, url, first).status_code == 200
+
+    def test_author_and_publisher_detail(self, client, book):
+
+        author = book.authors.get()
+        author_url = reverse('bookstore:author_detail', args=[author.pk])
+        publisher_url = reverse('bookstore:publisher_detail', args=[book.publisher.pk])
+        author_page = client.get(author_url)
+        publisher_page = client.get(publisher_url)
+        assert revalidate(client, author_url, author_page).status_code == 304
+        assert revalidate(client, publisher_url, publisher_page).status_code == 304
+
+        author.bio = 'Поет'
+        author.save()
+        book.title = 'Кобзар (нове видання)'
+        book.save()
+        assert revalidate(client, author_url, author_page).status_code == 200
+        assert revalidate(client, publisher_url, publisher_page).status_code == 200
+
+    def test_missing_object_is_still_404(self, client, db):
+
+        response = client.get(reverse('bookstore:book_detail', args=[999]), HTTP_IF_NONE_MATCH='"x"')
+        assert response.status_code == 404
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookstore.counters import ViewCounter, view_counter
+from bookstore.models import Book, Publisher
+
+
+@pytest.fixture
+def book(db):
+
+    return Book.objects.create(
+        title='Кобзар',
+        publisher=Publisher.objects.create(name='Видавництво'),
+        description='Опис',
+        pages=100,
+        price=100,
+        publication_date='2024-01-01',
+        stock=5
+    )
+
+
+@pytest.mark.django_db
+class TestViewCounter:
+
+
+    def test_book_detail_does_not_write_views(self, client, book):
+
+        url = reverse('bookstore:book_detail', kwargs={'pk': book.pk})
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+        assert all(query['sql'].startswith('SELECT') for query in queries.captured_queries)
+
+        book.refresh_from_db()
+        assert book.views == 0
+        assert view_counter.pending(book.pk) == 2
+        assert '<td>2</td>' in response.content.decode()
+
+    def test_flush_applies_buffered_views(self, book, django_assert_num_queries):
+
+        other = Book.objects.create(title='Енеїда', description='Опис', pages=1, price=1,
+                                    publication_date='2024-01-01', stock=1)
+        counter = ViewCounter()
+        for _ in range(3):
+            counter.record(book.pk)
+        counter.record(other.pk, count=3)
+
+        with django_assert_num_queries(3):
+            assert counter.flush() == 6
+
+        book.refresh_from_db()
+        other.refresh_from_db()
+        assert (book.views, other.views) == (3, 3)
+        assert counter.flush() == 0
+
+    def test_concurrent_records_are_not_lost(self, book, settings):
+
+        settings.BOOKSTORE_VIEWS_FLUSH_THRESHOLD = 0
+        counter = ViewCounter()
+
+        def hit():
+            for _ in range(500):
+                counter.record(book.pk)
+
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        counter.flush()
+        book.refresh_from_db()
+        assert book.views == 4000
+
+    def test_threshold_triggers_flush(self, book, settings):
+
+        settings.BOOKSTORE_VIEWS_FLUSH_THRESHOLD = 5
+        counter = ViewCounter()
+        for _ in range(5):
+            counter.record(book.pk)
+
+        book.refresh_from_db()
+        assert book.views == 5
+        assert counter.pending(book.pk) == 0
@@ -0,0 +1,127 @@
+import json
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from bookstore.models import Book, Author, Publisher, Genre
+from bookstore import search
+
+
+CSV_HEADER = 'isbn,title,authors,publisher,genres,price,discount,pages,publication_date,stock\n'
+
+
+def write(tmp_path, name, content):
+
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def run(*args):
+
+    out, err = StringIO(), StringIO()
+    call_command('import_books', *args, stdout=out, stderr=err)
+    return out.getvalue(), err.getvalue()
+
+
+@pytest.mark.django_db
+class TestImportBooks:
+
+    def test_csv_creates_books_and_lookups(self, tmp_path):
+
+        path = write(tmp_path, 'feed.csv', CSV_HEADER +
+                     '9786170000001,Кобзар,Тарас Шевченко,А-БА-БА-ГА-ЛА-МА-ГА,Поезія;Класика,250.00,10,320,2020-05-01,7\n'
+                     '9786170000002,Лісова пісня,Леся Українка,А-БА-БА-ГА-ЛА-МА-ГА,Драма,180,0,200,2019-01-01,3\n')
+
+        out, _ = run(path, '--batch-size', '1')
+
+        assert Book.objects.count() == 2
+        assert Publisher.objects.count() == 1
+        assert Genre.objects.count() == 3
+        kobzar = Book.objects.get(isbn='9786170000001')
+        assert kobzar.price == Decimal('250.00')
+        assert kobzar.authors_display == 'Тарас Шевченко'
+        assert set(kobzar.genres.values_list('name', flat=True)) == {'Поезія', 'Класика'}
+        assert list(search.search_books(Book.objects.all(), 'кобзар')) == [kobzar]
+        assert 'рядків/с' in out
+
+    def test_upsert_by_isbn(self, tmp_path):
+
+        author = Author.objects.create(first_name='Тарас', last_name='Шевченко')
+        publisher = Publisher.objects.create(name='Стара назва')
+        book = Book.objects.create(
+            isbn='9786170000001', title='Кобзар', publisher=publisher, description='Опис',
+            pages=100, price=100, publication_date='2010-01-01', stock=1
+        )
+        book.authors.add(author)
+
+        path = write(tmp_path, 'feed.csv', CSV_HEADER +
+                     '978-617-00000-0-1,Кобзар (нове видання),Тарас Шевченко;Іван Франко,Нове,Поезія,300,0,400,2024-01-01,9\n')
+        run(path)
+
+        book.refresh_from_db()
+        assert Book.objects.count() == 1
+        assert book.title == 'Кобзар (нове видання)'
+        assert book.stock == 9
+        assert book.publisher.name == 'Нове'
+        assert book.publisher.in_stock_book_count == 1
+        assert Publisher.objects.get(name='Стара назва').book_count == 0
+        assert Author.objects.count() == 2
+        assert set(book.authors_display.split(', ')) == {'Тарас Шевченко', 'Іван Франко'}
+
+    def test_jsonl_lists(self, tmp_path):
+
+        rows = [
+            {'isbn': '1', 'title': 'Тигролови', 'authors': ['Іван Багряний'], 'genres': ['Пригоди'],
+             'publisher': 'Фоліо', 'price': '199.90', 'publication_date': '2021-03-03', 'stock': 2},
+            {'title': 'Без ISBN', 'authors': ['Іван Багряний'], 'price': 50, 'publication_date': '2020-01-01'},
+        ]
+        path = write(tmp_path, 'feed.jsonl', '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows))
+
+        run(path)
+
+        assert Book.objects.count() == 2
+        assert Author.objects.count() == 1
+        assert Book.objects.get(title='Без ISBN').publisher is None
+        assert Book.objects.get(isbn='1').genres.get().name == 'Пригоди'
+
+    def test_bad_rows_are_skipped(self, tmp_path):
+
+        path = write(tmp_path, 'feed.csv', CSV_HEADER +
+                     '1,Добра,,,,100,0,10,2020-01-01,1\n'
+                     '2,,,,,100,0,10,2020-01-01,1\n'
+                     '3,Погана ціна,,,,дорого,0,10,2020-01-01,1\n')
+
+        out, err = run(path)
+
+        assert list(Book.objects.values_list('title', flat=True)) == ['Добра']
+        assert 'Рядок 2' in err and 'Рядок 3' in err
+        assert 'пропущено: 2' in out
+
+    def test_dry_run_saves_nothing(self, tmp_path):
+
+        path = write(tmp_path, 'feed.csv', CSV_HEADER +
+                     '1,Кобзар,Тарас Шевченко,Фоліо,Поезія,100,0,10,2020-01-01,1\n'
+                     '2,Гайдамаки,Тарас Шевченко,Фоліо,Поезія,100,0,10,2020-01-01,1\n')
+
+        out, _ = run(path, '--dry-run', '--batch-size', '1')
+
+        assert not Book.objects.exists()
+        assert not Author.objects.exists()
+        assert not Publisher.objects.exists()
+        assert 'створено: 2' in out
+
+    def test_resume_from_checkpoint(self, tmp_path):
+
+        path = write(tmp_path, 'feed.csv', CSV_HEADER +
+                     '1,Перша,,,,100,0,10,2020-01-01,1\n'
+                     '2,Друга,,,,100,0,10,2020-01-01,1\n'
+                     '3,Третя,,,,100,0,10,2020-01-01,1\n')
+        checkpoint = tmp_path / 'feed.checkpoint'
+        checkpoint.write_text(json.dumps({'source': path, 'rows': 2}))
+
+        run(path, '--checkpoint', str(checkpoint))
+
+        assert list(Book.objects.values_list('title', flat=True)) == ['Третя']
+        assert json.loads(checkpoint.read_text()) == {'source': path, 'rows': 3}
@@ -0,0 +1,100 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from bookstore.models import Book, Author, Publisher, Genre, Cart, CartItem, Order
+from bookstore.orders import place_order
+from bookstore.counters import view_counter
+from bookstore import page_cache
+
+
+@pytest.fixture(autouse=True)
+def enabled_page_cache(settings):
+
+    settings.BOOKSTORE_PAGE_CACHE_TIMEOUT = 600
+    settings.BOOKSTORE_PAGE_CACHE_ALIAS = 'default'
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def book(db):
+
+    publisher = Publisher.objects.create(name='Видавництво')
+    book = Book.objects.create(
+        title='Кобзар', publisher=publisher, description='Опис', pages=100,
+        price=100, publication_date='2024-01-01', stock=5
+    )
+    book.genres.add(Genre.objects.create(name='Поезія', slug='poetry'))
+    return book
+
+
+@pytest.mark.django_db
+class TestAnonymousPageCache:
+
+    def test_second_request_runs_no_queries(self, client, book, django_assert_num_queries):
+
+        client.get(reverse('bookstore:index'))
+        with django_assert_num_queries(0):
+            response = client.get(reverse('bookstore:index'))
+        assert 'Кобзар' in response.content.decode()
+
+    def test_query_string_is_normalized(self, client, book, django_assert_num_queries):
+
+        url = reverse('bookstore:book_list')
+        client.get(url + '?sort_by=title&query=')
+        with django_assert_num_queries(0):
+            client.get(url + '?sort_by=title')
+        assert page_cache.page_key(client.get(url + '?a=1&b=2').wsgi_request, 1) == \
+            page_cache.page_key(client.get(url + '?b=2&a=1').wsgi_request, 1)
+
+    def test_staff_edit_appears_immediately(self, client, book):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        client.get(url)
+
+        book.title = 'Кобзар (нове видання)'
+        book.save()
+        assert 'нове видання' in client.get(url).content.decode()
+
+        Genre.objects.filter(slug='poetry').get().books.clear()
+        Author.objects.create(first_name='Тарас', last_name='Шевченко').books.add(book)
+        assert 'Шевченко' in client.get(url).content.decode()
+
+    def test_cached_detail_still_counts_views(self, client, book):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        client.get(url)
+        client.get(url)
+        assert view_counter._pending[book.pk] == 2
+
+    def test_cached_page_answers_revalidation(self, client, book):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        first = client.get(url)
+        assert client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+    def test_signed_in_users_bypass_cache(self, client, book):
+
+        url = reverse('bookstore:index')
+        client.get(url)
+        user = User.objects.create_user(username='reader', password='secret-pass-1')
+        client.force_login(user)
+        response = client.get(url)
+        assert 'reader' in response.content.decode()
+
+    def test_order_invalidates_stock(self, client, book, django_capture_on_commit_callbacks):
+
+        url = reverse('bookstore:book_detail', args=[book.pk])
+        assert '(5 шт.)' in client.get(url).content.decode()
+
+        user = User.objects.create_user(username='buyer', password='secret-pass-1')
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, book=book, quantity=2)
+        order = Order(user=user, delivery_address='вул. Хрещатик, 1', delivery_city='Київ',
+                      delivery_postal_code='01001', phone='+380501234567')
+        with django_capture_on_commit_callbacks(execute=True):
+            place_order(order, cart)
+
+        assert '(3 шт.)' in client.get(url).content.decode()
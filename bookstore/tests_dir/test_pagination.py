@@ -0,0 +1,103 @@
+import pytest
+from django.urls import reverse
+from bookstore.models import Book, Publisher
+from bookstore.pagination import CursorPaginator
+from bookstore.search import search_books
+
+
+@pytest.fixture
+def books(db):
+
+    publisher = Publisher.objects.create(name='Видавництво')
+    return [
+        Book.objects.create(
+            title=f'Книга {i:02d}',
+            publisher=publisher,
+            isbn=f'{i:013d}',
+            description='Опис',
+            pages=100,
+            price=100 + i % 5,
+            views=i % 3,
+            publication_date='2024-01-01',
+            stock=5
+        )
+        for i in range(30)
+    ]
+
+
+@pytest.mark.django_db
+class TestCursorPaginator:
+
+
+    @pytest.mark.parametrize('ordering', [
+        ('-created_at', '-id'), ('price', 'id'), ('-price', '-id'), ('-views', '-id'), ('title', 'id'),
+    ])
+    def test_walks_every_row_once(self, books, ordering):
+
+        paginator = CursorPaginator(Book.objects.all(), 7, ordering)
+        expected = list(Book.objects.order_by(*ordering))
+
+        seen = []
+        page = paginator.page()
+        while True:
+            seen.extend(page)
+            if not page.has_next():
+                break
+            page = paginator.page(page.next_cursor)
+
+        assert seen == expected
+
+    def test_previous_cursor_returns_previous_page(self, books):
+
+        paginator = CursorPaginator(Book.objects.all(), 7, ('price', 'id'))
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+
+        back = paginator.page(second.previous_cursor)
+
+        assert list(back) == list(first)
+        assert not back.has_previous()
+
+    def test_tampered_cursor_falls_back_to_first_page(self, books):
+
+        paginator = CursorPaginator(Book.objects.all(), 7, ('title', 'id'))
+
+        page = paginator.page('not-a-cursor')
+
+        assert list(page) == list(Book.objects.order_by('title', 'id')[:7])
+
+    def test_approximate_count_is_capped(self, books):
+
+        paginator = CursorPaginator(Book.objects.all(), 7, ('title', 'id'), count_limit=10)
+
+        assert paginator.count == 10
+        assert paginator.count_is_capped
+
+    def test_deep_page_query_count(self, books, django_assert_num_queries):
+
+        paginator = CursorPaginator(Book.objects.all(), 2, ('-created_at', '-id'))
+        cursor = paginator.page().next_cursor
+        for _ in range(10):
+            cursor = paginator.page(cursor).next_cursor
+
+        with django_assert_num_queries(1):
+            paginator.page(cursor)
+
+    def test_book_list_cursor_mode(self, client, books):
+
+        response = client.get(reverse('bookstore:book_list') + '?cursor=&sort_by=title')
+        content = response.content.decode()
+
+        assert response.status_code == 200
+        assert 'Книга 00' in content
+        assert 'cursor=' in content
+        assert 'Сторінка' not in content
+
+    def test_search_results_paginate_by_rank(self, books):
+
+        queryset = search_books(Book.objects.all(), 'книга')
+        paginator = CursorPaginator(queryset, 7, ('search_rank', 'id'))
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+
+        assert list(first) + list(second) == list(queryset[:14])
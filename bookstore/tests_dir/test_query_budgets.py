@@ -0,0 +1,192 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookstore import book_counts, urls
+from bookstore.models import (
+    Book, Author, Publisher, Genre, UserProfile, Cart, CartItem, Order, OrderItem
+)
+
+
+ROLES = ('anonymous', 'regular', 'staff')
+
+# maximum queries per GET: (anonymous, regular, staff). A signed-in request pays
+# for the session, the user and the cart badge on top of the view itself.
+BUDGETS = {
+    'index': (3, 9, 9),
+    'book_list': (7, 13, 13),
+    'book_suggest': (0, 2, 2),
+    'book_detail': (6, 12, 12),
+    'book_create': (0, 2, 9),
+    'book_update': (0, 2, 12),
+    'book_delete': (0, 2, 7),
+    'author_list': (2, 8, 8),
+    'author_detail': (4, 10, 10),
+    'author_create': (0, 2, 6),
+    'author_update': (0, 2, 7),
+    'author_delete': (0, 2, 7),
+    'publisher_list': (2, 8, 8),
+    'publisher_detail': (4, 10, 10),
+    'publisher_create': (0, 2, 6),
+    'publisher_update': (0, 2, 7),
+    'publisher_delete': (0, 2, 7),
+    'register': (0, 2, 2),
+    'login': (0, 2, 2),
+    'logout': (0, 4, 4),
+    'profile': (0, 9, 9),
+    'profile_edit': (0, 7, 7),
+    'order_detail': (0, 8, 3),
+    'cart': (0, 8, 8),
+    'add_to_cart': (0, 5, 8),
+    'remove_from_cart': (0, 5, 3),
+    'update_cart_item': (0, 2, 2),
+    'checkout': (0, 10, 4),
+    'about': (0, 6, 6),
+}
+
+
+def catalog_size(size):
+
+    return {'books': size * 10, 'authors': size * 3, 'genres': size + 2, 'publishers': size + 1,
+            'cart_items': size + 1, 'orders': size + 1, 'order_items': size + 1}
+
+
+def grow_catalog(data, size):
+
+    counts = catalog_size(size)
+    publishers = Publisher.objects.bulk_create([
+        Publisher(name=f'Видавництво {len(data["publishers"]) + i}')
+        for i in range(counts['publishers'] - len(data['publishers']))
+    ])
+    data['publishers'] += publishers
+    genres = Genre.objects.bulk_create([
+        Genre(name=f'Жанр {len(data["genres"]) + i}', slug=f'genre-{len(data["genres"]) + i}')
+        for i in range(counts['genres'] - len(data['genres']))
+    ])
+    data['genres'] += genres
+    authors = Author.objects.bulk_create([
+        Author(first_name='Автор', last_name=f'Прізвище {len(data["authors"]) + i}')
+        for i in range(counts['authors'] - len(data['authors']))
+    ])
+    data['authors'] += authors
+
+    start = len(data['books'])
+    books = Book.objects.bulk_create([
+        Book(title=f'Книга {start + i}', isbn=f'{start + i:013d}', publisher=data['publishers'][(start + i) % len(data['publishers'])],
+             description='Опис', pages=100, price=100 + i, views=i, publication_date='2024-01-01',
+             stock=(start + i) % 5)
+        for i in range(counts['books'] - start)
+    ])
+    data['books'] += books
+    Book.authors.through.objects.bulk_create([
+        Book.authors.through(book_id=book.pk, author_id=data['authors'][(book.pk + shift) % len(data['authors'])].pk)
+        for book in books for shift in (0, 1)
+    ], ignore_conflicts=True)
+    Book.genres.through.objects.bulk_create([
+        Book.genres.through(book_id=book.pk, genre_id=data['genres'][(book.pk + shift) % len(data['genres'])].pk)
+        for book in books for shift in (0, 1)
+    ], ignore_conflicts=True)
+    Book.refresh_authors_display([book.pk for book in books])
+    book_counts.reconcile()
+
+    in_stock = [book for book in data['books'] if book.stock > 0]
+    cart = data['cart']
+    linked = set(cart.items.values_list('book_id', flat=True))
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, book=book, quantity=1)
+        for book in [book for book in in_stock if book.pk not in linked][:counts['cart_items'] - len(linked)]
+    ])
+
+    for _ in range(counts['orders'] - Order.objects.filter(user=data['regular']).count()):
+        order = Order.objects.create(user=data['regular'], delivery_address='вул. Хрещатик, 1',
+                                     delivery_city='Київ', delivery_postal_code='01001',
+                                     phone='+380501234567', total_price=0)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, book=book, quantity=1, price=book.price)
+            for book in in_stock[:counts['order_items']]
+        ])
+    data['order'] = Order.objects.filter(user=data['regular']).order_by('-pk').first()
+    data['order'].items.bulk_create([
+        OrderItem(order=data['order'], book=book, quantity=1, price=book.price)
+        for book in in_stock[data['order'].items.count():counts['order_items']]
+    ])
+    return data
+
+
+@pytest.fixture
+def catalog(db):
+
+    regular = User.objects.create_user(username='reader', password='secret-pass-1')
+    staff = User.objects.create_user(username='manager', password='secret-pass-1', is_staff=True)
+    for user in (regular, staff):
+        UserProfile.objects.create(user=user, city='Київ')
+        Cart.objects.create(user=user)
+    data = {'regular': regular, 'staff': staff, 'cart': regular.cart,
+            'publishers': [], 'genres': [], 'authors': [], 'books': []}
+    return grow_catalog(data, 1)
+
+
+def route_kwargs(data):
+
+    book = data['books'][1]
+    return {
+        'book_detail': {'pk': book.pk}, 'book_update': {'pk': book.pk}, 'book_delete': {'pk': book.pk},
+        'author_detail': {'pk': data['authors'][0].pk}, 'author_update': {'pk': data['authors'][0].pk},
+        'author_delete': {'pk': data['authors'][0].pk},
+        'publisher_detail': {'pk': data['publishers'][0].pk}, 'publisher_update': {'pk': data['publishers'][0].pk},
+        'publisher_delete': {'pk': data['publishers'][0].pk},
+        'order_detail': {'pk': data['order'].pk},
+        'add_to_cart': {'pk': book.pk},
+        'remove_from_cart': {'pk': data['cart'].items.order_by('pk').first().pk},
+        'update_cart_item': {'pk': data['cart'].items.order_by('pk').first().pk},
+    }
+
+
+def route_names():
+
+    return [pattern.name for pattern in urls.urlpatterns]
+
+
+def count_queries(data, name, role):
+
+    client = Client()
+    if role != 'anonymous':
+        client.force_login(data[role])
+    url = reverse(f'bookstore:{name}', kwargs=route_kwargs(data).get(name))
+    # GET on add_to_cart, logout etc. changes state, so every route starts from the same data
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        transaction.set_rollback(True)
+    return len(queries)
+
+
+def measure(data, role):
+
+    return {name: count_queries(data, name, role) for name in route_names()}
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+
+    def test_every_route_has_a_budget(self):
+
+        assert sorted(route_names()) == sorted(BUDGETS)
+
+    @pytest.mark.parametrize('role', ROLES)
+    def test_routes_stay_within_budget_as_catalog_grows(self, catalog, role):
+
+        small = measure(catalog, role)
+        grow_catalog(catalog, 4)
+        large = measure(catalog, role)
+
+        problems = []
+        for name, budget in BUDGETS.items():
+            limit = budget[ROLES.index(role)]
+            if small[name] > limit:
+                problems.append(f'{name}: {small[name]} queries, budget {limit}')
+            if large[name] != small[name]:
+                problems.append(f'{name}: {small[name]} queries grew to {large[name]} with a larger catalog')
+        assert not problems, '\n'.join(problems)
@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookstore.models import Book, Author, Publisher, Genre
+
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is SQLite-specific')
+
+M2M_INDEX_MARKERS = ('book_authors', 'book_genres')
+
+
+@pytest.fixture
+def catalog(db):
+
+    publisher = Publisher.objects.create(name='Видавництво')
+    author = Author.objects.create(first_name='Тарас', last_name='Шевченко')
+    genre = Genre.objects.create(name='Поезія')
+    books = []
+    for i in range(20):
+        book = Book.objects.create(
+            title=f'Книга {i}',
+            publisher=publisher,
+            isbn=f'{i:013d}',
+            description='Опис',
+            pages=100,
+            price=100 + i,
+            views=i,
+            publication_date='2024-01-01',
+            stock=i % 4
+        )
+        book.authors.add(author)
+        book.genres.add(genre)
+        books.append(book)
+    return {'publisher': publisher, 'author': author, 'genre': genre, 'book': books[1]}
+
+
+def catalog_urls(catalog):
+
+    book_list = reverse('bookstore:book_list')
+    return [
+        reverse('bookstore:index'),
+        book_list,
+        book_list + '?sort_by=price_asc',
+        book_list + '?sort_by=price_desc',
+        book_list + '?sort_by=popularity',
+        book_list + '?sort_by=title',
+        book_list + f'?publisher={catalog["publisher"].pk}',
+        book_list + '?cursor=&sort_by=title',
+        reverse('bookstore:book_detail', kwargs={'pk': catalog['book'].pk}),
+        reverse('bookstore:author_detail', kwargs={'pk': catalog['author'].pk}),
+        reverse('bookstore:publisher_detail', kwargs={'pk': catalog['publisher'].pk}),
+    ]
+
+
+def query_plan(sql):
+
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(plan):
+
+    problems = [line for line in plan if line.startswith('SCAN bookstore_book') and 'USING' not in line]
+
+    # sorting is only acceptable for the small set of rows picked out of an M2M table by index
+    from_m2m_index = any(
+        line.startswith('SEARCH') and any(marker in line for marker in M2M_INDEX_MARKERS)
+        for line in plan
+    )
+    if not from_m2m_index:
+        problems += [line for line in plan if 'USE TEMP B-TREE' in line]
+    return problems
+
+
+@pytest.mark.django_db
+class TestCatalogQueryPlans:
+
+
+    def test_no_full_scans_or_sorts_on_books(self, client, catalog):
+
+        failures = {}
+        for url in catalog_urls(catalog):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            assert response.status_code == 200
+
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or 'FROM "bookstore_book"' not in sql:
+                    continue
+                problems = plan_problems(query_plan(sql))
+                if problems:
+                    failures.setdefault(url, []).append((sql, problems))
+
+        assert not failures, failures
@@ -0,0 +1,93 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from bookstore.models import Book, Author, Publisher, Genre, Order, OrderItem, RelatedBook
+
+
+@pytest.fixture
+def publisher(db):
+
+    return Publisher.objects.create(name='Видавництво')
+
+
+@pytest.fixture
+def genres(db):
+
+    return [Genre.objects.create(name=name, slug=slug) for name, slug in
+            (('Поезія', 'poetry'), ('Класика', 'classics'), ('Драма', 'drama'))]
+
+
+def make_book(publisher, title, genres=(), authors=(), stock=5):
+
+    book = Book.objects.create(
+        title=title, publisher=publisher, description='Опис', pages=100,
+        price=100, publication_date='2024-01-01', stock=stock
+    )
+    book.genres.add(*genres)
+    book.authors.add(*authors)
+    return book
+
+
+def related_titles(book):
+
+    return [entry.related.title for entry in RelatedBook.objects.filter(book=book).select_related('related')]
+
+
+@pytest.mark.django_db
+class TestRelatedBooks:
+
+
+    def test_ranked_by_shared_genres_and_authors(self, publisher, genres):
+
+        author = Author.objects.create(first_name='Тарас', last_name='Шевченко')
+        target = make_book(publisher, 'Кобзар', genres[:2], [author])
+        make_book(publisher, 'Один жанр', genres[:1])
+        make_book(publisher, 'Два жанри', genres[:2])
+        make_book(publisher, 'Той самий автор', genres[1:2], [author])
+        make_book(publisher, 'Інший жанр', genres[2:])
+
+        assert related_titles(target) == ['Той самий автор', 'Два жанри', 'Один жанр']
+
+    def test_out_of_stock_books_skipped(self, publisher, genres):
+
+        target = make_book(publisher, 'Кобзар', genres[:1])
+        make_book(publisher, 'Немає на складі', genres[:1], stock=0)
+
+        assert related_titles(target) == []
+
+    def test_incremental_update_on_genre_change(self, publisher, genres):
+
+        target = make_book(publisher, 'Кобзар', genres[:1])
+        other = make_book(publisher, 'Енеїда', genres[:1])
+        assert related_titles(target) == ['Енеїда']
+
+        other.genres.set([genres[2]])
+
+        assert related_titles(target) == []
+        assert related_titles(other) == []
+
+    def test_co_purchases_add_weight(self, publisher, genres):
+
+        target = make_book(publisher, 'Кобзар', genres[:1])
+        make_book(publisher, 'Енеїда', genres[:1])
+        bought_together = make_book(publisher, 'Лісова пісня', genres[:1])
+
+        user = User.objects.create_user(username='reader', password='pass12345')
+        order = Order.objects.create(user=user, total_price=200, delivery_address='вул. Хрещатик, 1',
+                                     delivery_city='Київ', delivery_postal_code='01001', phone='+380')
+        OrderItem.objects.create(order=order, book=target, quantity=1, price=100)
+        OrderItem.objects.create(order=order, book=bought_together, quantity=1, price=100)
+
+        call_command('rebuild_related_books')
+
+        assert related_titles(target) == ['Лісова пісня', 'Енеїда']
+
+    def test_book_detail_reads_precomputed_rows(self, client, publisher, genres):
+
+        target = make_book(publisher, 'Кобзар', genres[:1])
+        make_book(publisher, 'Енеїда', genres[:1])
+
+        response = client.get(reverse('bookstore:book_detail', kwargs={'pk': target.pk}))
+
+        assert [book.title for book in response.context['related_books']] == ['Енеїда']
@@ -0,0 +1,89 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from bookstore import search
+from bookstore.models import Book, Author, Publisher
+
+
+@pytest.fixture
+def publisher(db):
+
+    return Publisher.objects.create(name='Видавництво Старого Лева')
+
+
+def make_book(publisher, title, isbn, description='Опис', stock=5):
+
+    return Book.objects.create(
+        title=title,
+        publisher=publisher,
+        isbn=isbn,
+        description=description,
+        pages=100,
+        price=100,
+        publication_date='2024-01-01',
+        stock=stock
+    )
+
+
+@pytest.mark.django_db
+class TestSearchIndex:
+
+
+    def test_search_by_title_prefix(self, publisher):
+
+        book = make_book(publisher, 'Кобзар', '1111111111111')
+        make_book(publisher, 'Енеїда', '2222222222222')
+
+        result = search.search_books(Book.objects.all(), 'кобз')
+
+        assert list(result) == [book]
+
+    def test_search_follows_author_changes(self, publisher):
+
+        book = make_book(publisher, 'Збірка', '1111111111111')
+        author = Author.objects.create(first_name='Леся', last_name='Українка')
+
+        book.authors.add(author)
+        assert list(search.search_books(Book.objects.all(), 'Українка')) == [book]
+
+        author.last_name = 'Косач'
+        author.save()
+        assert list(search.search_books(Book.objects.all(), 'Українка')) == []
+        assert list(search.search_books(Book.objects.all(), 'Косач')) == [book]
+
+        author.books.clear()
+        assert list(search.search_books(Book.objects.all(), 'Косач')) == []
+
+    def test_results_ranked_by_relevance(self, publisher):
+
+        in_description = make_book(publisher, 'Мандри', '1111111111111', description='Про море')
+        in_title = make_book(publisher, 'Море', '2222222222222')
+
+        result = list(search.search_books(Book.objects.all(), 'море'))
+
+        assert result == [in_title, in_description]
+
+    def test_deleted_book_removed_from_index(self, publisher):
+
+        book = make_book(publisher, 'Кобзар', '1111111111111')
+        book.delete()
+
+        assert search.get_backend().search_ids('Кобзар', 10) == []
+
+    def test_rebuild_command(self, publisher):
+
+        book = make_book(publisher, 'Кобзар', '1111111111111')
+        search.get_backend().clear()
+        assert list(search.search_books(Book.objects.all(), 'Кобзар')) == []
+
+        call_command('rebuild_search_index')
+
+        assert list(search.search_books(Book.objects.all(), 'Кобзар')) == [book]
+
+    def test_book_list_search_by_isbn(self, client, publisher):
+
+        make_book(publisher, 'Кобзар', '9781234567897')
+
+        response = client.get(reverse('bookstore:book_list') + '?query=9781234567897')
+
+        assert 'Кобзар' in response.content.decode()
@@ -0,0 +1,100 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from bookstore import book_counts
+from bookstore.benchmark import percentile
+from bookstore.models import Book, Author, Genre, Order, OrderItem, Publisher
+
+
+SIZES = ['--books', '60', '--authors', '15', '--publishers', '4', '--genres', '6',
+         '--users', '5', '--orders', '8', '--batch-size', '25']
+
+
+def snapshot():
+
+    return {
+        'books': list(Book.objects.order_by('isbn').values_list(
+            'title', 'isbn', 'price', 'discount', 'stock', 'views', 'authors_display')),
+        'genres': sorted(Book.genres.through.objects.values_list('book__isbn', 'genre__slug')),
+        'orders': sorted(OrderItem.objects.values_list('book__isbn', 'quantity', 'price')),
+    }
+
+
+@pytest.mark.django_db
+class TestSeedCatalog:
+
+    def test_seeds_consistent_catalog(self, client):
+
+        call_command('seed_catalog', *SIZES, stdout=StringIO())
+
+        assert Book.objects.count() == 60
+        assert Author.objects.count() == 15
+        assert Genre.objects.count() == 6
+        assert Order.objects.count() == 8
+        assert not Book.objects.filter(authors=None).exists()
+        assert book_counts.reconcile() == {Genre: 0, Author: 0, Publisher: 0}
+        for order in Order.objects.prefetch_related('items'):
+            assert order.total_price == sum(item.price * item.quantity for item in order.items.all())
+
+        response = client.get('/books/', {'query': 'Синтетичний'})
+        assert response.context['page_obj'].paginator.count == Book.objects.filter(stock__gt=0).count()
+
+    def test_same_seed_gives_same_data(self):
+
+        call_command('seed_catalog', *SIZES, '--seed', '7', stdout=StringIO())
+        first = snapshot()
+        for model in (Order, User, Book, Author, Publisher, Genre):
+            model.objects.all().delete()
+
+        call_command('seed_catalog', *SIZES, '--seed', '7', stdout=StringIO())
+        assert snapshot() == first
+
+
+@pytest.mark.django_db
+class TestBenchViews:
+
+    def test_percentile_nearest_rank(self):
+
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([3], 95) == 3
+        assert percentile([], 50) is None
+
+    def test_reports_json_per_url(self):
+
+        call_command('seed_catalog', *SIZES, stdout=StringIO())
+        out = StringIO()
+        call_command('bench_views', '/', '/books/', '--requests', '3', stdout=out)
+
+        report = json.loads(out.getvalue())
+        assert set(report['urls']) == {'/', '/books/'}
+        for stats in report['urls'].values():
+            assert stats['requests'] == 3
+            assert stats['errors'] == 0
+            assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+        assert report['total']['requests'] == 6
+        assert report['mode'] == 'client'
+
+
+@pytest.mark.django_db
+class TestBenchSqlite:
+
+    def test_compares_default_and_wal_profiles(self, tmp_path):
+
+        call_command('seed_catalog', *SIZES, stdout=StringIO())
+        output = tmp_path / 'report.json'
+        call_command('bench_sqlite', '--seconds', '0.3', '--readers', '2', '--writers', '1',
+                     '--output', str(output), stderr=StringIO())
+
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['default']['journal_mode'] == 'delete'
+        assert report['sqlite-wal']['journal_mode'] == 'wal'
+        for profile in ('default', 'sqlite-wal'):
+            for kind in ('read', 'write'):
+                assert report[profile][kind]['requests'] > 0
+                assert report[profile][kind]['errors'] == 0
+        assert report['gain']['read_rps'] > 0
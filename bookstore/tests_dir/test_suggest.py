@@ -0,0 +1,113 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from bookstore.models import Book, Author, Publisher
+from bookstore.suggest import PrefixIndex, normalize, suggest_index
+
+
+@pytest.fixture
+def publisher(db):
+
+    return Publisher.objects.create(name='Видавництво')
+
+
+def make_book(publisher, title, views=0, isbn=None):
+
+    return Book.objects.create(
+        title=title, publisher=publisher, isbn=isbn, description='Опис', pages=100,
+        price=100, publication_date='2024-01-01', stock=5, views=views
+    )
+
+
+def labels(query, limit=8):
+
+    return [item['label'] for item in suggest_index.suggest(query, limit)]
+
+
+class TestPrefixIndex:
+
+    def test_top_results_match_brute_force(self):
+
+        words = ['ліс', 'лісова', 'пісня', 'пісок', 'ріка', 'рада', 'зима']
+        rows = [(pk, f'{words[pk % 7]} {words[pk * 3 % 7]}', pk * 37 % 101) for pk in range(1, 300)]
+        index = PrefixIndex()
+        index.build(rows)
+        texts = {pk: normalize(label) for pk, label, _ in rows}
+        scores = {pk: score for pk, _, score in rows}
+
+        for prefix in ('л', 'лі', 'ліс', 'лісо', 'пі', 'піс', 'пісн', 'р', 'зи', 'х'):
+            matching = [pk for pk, text in texts.items()
+                        if text.startswith(prefix) or f' {prefix}' in text]
+            expected, seen = [], set()
+            for pk in sorted(matching, key=lambda pk: (-scores[pk], pk)):
+                if texts[pk] not in seen:
+                    seen.add(texts[pk])
+                    expected.append(pk)
+            assert [index.pks[slot] for slot in index.search(prefix, 5)] == expected[:5], prefix
+
+
+@pytest.mark.django_db
+class TestSuggest:
+
+    def test_ranked_by_popularity_and_word_prefix(self, publisher):
+
+        make_book(publisher, 'Лісова пісня', views=10)
+        make_book(publisher, 'Пісня про Роланда', views=50)
+        make_book(publisher, 'Кобзар', views=100)
+
+        assert labels('піс') == ['Пісня про Роланда', 'Лісова пісня']
+        assert labels('ЛІСОВА п') == ['Лісова пісня']
+        assert labels('піс', limit=1) == ['Пісня про Роланда']
+        assert labels('   ') == []
+
+    def test_authors_and_isbn(self, publisher):
+
+        book = make_book(publisher, 'Кобзар', views=5, isbn='9789660000001')
+        author = Author.objects.create(first_name='Тарас', last_name='Шевченко')
+        book.authors.add(author)
+
+        suggestions = suggest_index.suggest('шевч')
+        assert suggestions == [{'type': 'author', 'label': 'Тарас Шевченко',
+                                'url': reverse('bookstore:author_detail', args=[author.pk])}]
+        assert labels('978-966') == ['Кобзар']
+
+    def test_follows_model_changes(self, publisher):
+
+        book = make_book(publisher, 'Енеїда', views=5)
+        assert labels('ене') == ['Енеїда']
+
+        book.title = 'Наталка Полтавка'
+        book.save()
+        assert labels('ене') == []
+        assert labels('полт') == ['Наталка Полтавка']
+
+        make_book(publisher, 'Полтава', views=9)
+        assert labels('полт') == ['Полтава', 'Наталка Полтавка']
+
+        book.delete()
+        assert labels('полт') == ['Полтава']
+
+        author = Author.objects.create(first_name='Іван', last_name='Котляревський')
+        assert labels('котл') == ['Іван Котляревський']
+        author.delete()
+        assert labels('котл') == []
+
+    def test_endpoint(self, client, publisher, django_assert_num_queries):
+
+        make_book(publisher, 'Кобзар', views=5)
+        url = reverse('bookstore:book_suggest')
+        client.get(url, {'q': 'к'})
+
+        with django_assert_num_queries(0):
+            response = client.get(url, {'q': 'коб', 'limit': 'x'})
+        assert response.json()['suggestions'][0]['label'] == 'Кобзар'
+
+    def test_stats_command(self, publisher):
+
+        make_book(publisher, 'Кобзар')
+        out = StringIO()
+        call_command('suggest_index_stats', '--lookups', '10', stdout=out)
+        assert 'МБ' in out.getvalue()
+        assert 'p99' in out.getvalue()
@@ -0,0 +1,96 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+from bookstore.models import Book, Publisher
+from bookstore import thumbnails
+
+
+def image_file(name, size=(900, 1300), color='navy'):
+
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.BOOKSTORE_THUMBNAIL_WORKERS = 0
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+@pytest.fixture
+def publisher(db):
+
+    return Publisher.objects.create(name='Видавництво')
+
+
+def make_book(publisher, **kwargs):
+
+    return Book.objects.create(
+        title='Кобзар', publisher=publisher, description='Опис', pages=100,
+        price=100, publication_date='2024-01-01', stock=5, **kwargs
+    )
+
+
+@pytest.mark.django_db
+class TestThumbnails:
+
+    def test_variants_generated_after_commit(self, publisher, django_capture_on_commit_callbacks):
+
+        with django_capture_on_commit_callbacks(execute=True):
+            book = make_book(publisher, cover_image=image_file('kobzar.jpg'))
+
+        variants = thumbnails.available_variants(book.cover_image)
+        assert set(variants) == {'small', 'card', 'large'}
+        with default_storage.open(variants['card'][1]) as file:
+            image = Image.open(file)
+            assert image.size == (240, 350)
+            assert image.format == 'WEBP'
+
+    def test_falls_back_to_original_until_ready(self, publisher, django_capture_on_commit_callbacks):
+
+        with django_capture_on_commit_callbacks(execute=False):
+            book = make_book(publisher, cover_image=image_file('kobzar.jpg'))
+
+        assert thumbnails.thumbnail_url(book.cover_image, 'card') == book.cover_image.url
+        assert thumbnails.srcset(book.cover_image) == ''
+
+    def test_logo_keeps_aspect_ratio(self, django_capture_on_commit_callbacks):
+
+        with django_capture_on_commit_callbacks(execute=True):
+            publisher = Publisher.objects.create(name='Фоліо', logo=image_file('logo.jpg', size=(800, 200)))
+
+        name = thumbnails.available_variants(publisher.logo)['small'][1]
+        with default_storage.open(name) as file:
+            assert Image.open(file).size == (200, 50)
+
+    def test_listing_uses_srcset(self, client, publisher, django_capture_on_commit_callbacks):
+
+        with django_capture_on_commit_callbacks(execute=True):
+            make_book(publisher, cover_image=image_file('kobzar.jpg'))
+
+        content = client.get(reverse('bookstore:book_list')).content.decode()
+        assert 'kobzar_240x350.webp 240w' in content
+        assert 'kobzar_480x700.webp 480w' in content
+
+    def test_backfill_command(self, publisher, django_capture_on_commit_callbacks):
+
+        with django_capture_on_commit_callbacks(execute=False):
+            book = make_book(publisher, cover_image=image_file('kobzar.jpg'))
+        assert thumbnails.needs_variants(book.cover_image)
+
+        out = StringIO()
+        call_command('generate_thumbnails', '--workers', '0', stdout=out)
+
+        assert not thumbnails.needs_variants(book.cover_image)
+        assert 'створено варіантів: 3' in out.getvalue()
@@ -0,0 +1,70 @@
+import json
+import logging
+
+import pytest
+from django.urls import reverse
+from bookstore.models import Book, Publisher
+
+
+@pytest.fixture
+def book(db):
+
+    return Book.objects.create(
+        title='Кобзар', publisher=Publisher.objects.create(name='Видавництво'), description='Опис',
+        pages=100, price=100, publication_date='2024-01-01', stock=5
+    )
+
+
+def timings(response):
+
+    metrics = {}
+    for item in response['Server-Timing'].split(', '):
+        name, *params = item.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_header_reports_db_templates_and_view(self, client, book, settings):
+
+        settings.BOOKSTORE_TIMING_SAMPLE_RATE = 1.0
+        response = client.get(reverse('bookstore:book_detail', args=[book.pk]))
+
+        metrics = timings(response)
+        assert set(metrics) == {'db', 'tpl', 'view'}
+        assert metrics['db']['desc'] != '"SQL (0)"'
+        assert float(metrics['tpl']['dur']) > 0
+        assert float(metrics['view']['dur']) >= float(metrics['tpl']['dur'])
+
+    def test_structured_log_line(self, client, book, settings, caplog):
+
+        settings.BOOKSTORE_TIMING_SAMPLE_RATE = 1.0
+        settings.BOOKSTORE_SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.INFO, logger='bookstore.timing'):
+            client.get(reverse('bookstore:book_list'))
+
+        [record] = caplog.records
+        data = json.loads(record.getMessage())
+        assert data['path'] == reverse('bookstore:book_list')
+        assert data['status'] == 200
+        assert data['queries'] > 0
+        assert record.timing == data
+
+    def test_slow_request_logs_sql(self, client, book, settings, caplog):
+
+        settings.BOOKSTORE_TIMING_SAMPLE_RATE = 1.0
+        settings.BOOKSTORE_SLOW_REQUEST_MS = 0.001
+        with caplog.at_level(logging.INFO, logger='bookstore.timing'):
+            client.get(reverse('bookstore:book_list'))
+
+        slow = [record for record in caplog.records if record.levelno == logging.WARNING]
+        assert len(slow) == 1
+        assert any('bookstore_book' in query['sql'] for query in slow[0].timing['sql'])
+
+    def test_unsampled_requests_are_untouched(self, client, book, settings):
+
+        settings.BOOKSTORE_TIMING_SAMPLE_RATE = 0
+        response = client.get(reverse('bookstore:book_list'))
+        assert not response.has_header('Server-Timing')
@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import multiprocessing
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbs'
+CACHE_PREFIX = 'bookstore:thumbs:'
+
+# variant name -> (width, height, crop); crop=False fits the image inside the box
+VARIANTS = {
+    'cover': {
+        'small': (60, 84, True),
+        'card': (240, 350, True),
+        'large': (480, 700, True),
+    },
+    'portrait': {
+        'small': (120, 120, True),
+        'large': (240, 240, True),
+    },
+    'logo': {
+        'small': (200, 100, False),
+        'large': (400, 200, False),
+    },
+    'avatar': {
+        'small': (150, 150, True),
+        'large': (300, 300, True),
+    },
+}
+
+# (app_label.ModelName, field name) -> variant set
+IMAGE_FIELDS = {
+    ('bookstore.Book', 'cover_image'): 'cover',
+    ('bookstore.Author', 'photo'): 'portrait',
+    ('bookstore.Publisher', 'logo'): 'logo',
+    ('bookstore.UserProfile', 'avatar'): 'avatar',
+}
+
+_executor = None
+
+
+def get_format():
+
+    return getattr(settings, 'BOOKSTORE_THUMBNAIL_FORMAT', 'WEBP').upper()
+
+
+def get_quality():
+
+    return getattr(settings, 'BOOKSTORE_THUMBNAIL_QUALITY', 80)
+
+
+def get_variants(fieldfile):
+
+    opts = fieldfile.instance._meta
+    kind = IMAGE_FIELDS.get((opts.label, fieldfile.field.name))
+    return VARIANTS.get(kind, {})
+
+
+def variant_name(name, width, height):
+
+    stem = posixpath.splitext(name)[0]
+    extension = 'jpg' if get_format() == 'JPEG' else get_format().lower()
+    return posixpath.join(THUMBNAIL_DIR, f'{stem}_{width}x{height}.{extension}')
+
+
+def render_variant(image, width, height, crop):
+
+    if crop:
+        return ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    image = image.copy()
+    image.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return image
+
+
+def _cache_key(name):
+
+    return CACHE_PREFIX + hashlib.md5(name.encode()).hexdigest()
+
+
+def generate_variants(name, sizes, force=False):
+    """Створює зменшені копії зображення name; sizes — список (width, height, crop)."""
+
+    try:
+        with default_storage.open(name, 'rb') as file:
+            image = ImageOps.exif_transpose(Image.open(file))
+            image.load()
+    except (OSError, UnidentifiedImageError):
+        logger.warning("Не вдалося відкрити зображення %s", name)
+        return []
+
+    fmt = get_format()
+    has_alpha = image.mode in ('RGBA', 'LA', 'P') and fmt != 'JPEG'
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    created = []
+    for width, height, crop in sizes:
+        target = variant_name(name, width, height)
+        if default_storage.exists(target):
+            if not force:
+                continue
+            default_storage.delete(target)
+        buffer = BytesIO()
+        render_variant(image, width, height, crop).save(buffer, fmt, quality=get_quality(), optimize=True)
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+        created.append(target)
+    cache.delete(_cache_key(name))
+    return created
+
+
+def _init_worker():
+
+    import django
+    django.setup()
+
+
+def make_executor(workers):
+
+    # spawn: forking a server process that already runs threads is not safe
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker
+    )
+
+
+def get_executor():
+
+    global _executor
+    workers = getattr(settings, 'BOOKSTORE_THUMBNAIL_WORKERS', 2)
+    if workers <= 0:
+        return None
+    if _executor is None:
+        _executor = make_executor(workers)
+    return _executor
+
+
+def schedule(fieldfile, force=False):
+
+    if not fieldfile:
+        return
+    name = fieldfile.name
+    sizes = list(get_variants(fieldfile).values())
+    if not sizes:
+        return
+
+    def submit():
+        executor = get_executor()
+        if executor is None:
+            generate_variants(name, sizes, force)
+        else:
+            executor.submit(generate_variants, name, sizes, force)
+
+    # the upload may still be rolled back together with the row that owns it
+    transaction.on_commit(submit)
+
+
+def available_variants(fieldfile):
+    """Назви варіантів, які вже згенеровані (результат кешується, коли всі готові)."""
+
+    if not fieldfile:
+        return {}
+    variants = get_variants(fieldfile)
+    key = _cache_key(fieldfile.name)
+    available = cache.get(key)
+    if available is None:
+        available = {
+            label: (width, variant_name(fieldfile.name, width, height))
+            for label, (width, height, _) in variants.items()
+            if default_storage.exists(variant_name(fieldfile.name, width, height))
+        }
+        # a partial set means a worker is still busy, so ask the storage again next time
+        if len(available) == len(variants):
+            cache.set(key, available, None)
+    return available
+
+
+def needs_variants(fieldfile):
+
+    return bool(fieldfile) and len(available_variants(fieldfile)) < len(get_variants(fieldfile))
+
+
+def thumbnail_url(fieldfile, label):
+
+    variant = available_variants(fieldfile).get(label)
+    if variant is None:
+        return fieldfile.url if fieldfile else ''
+    return default_storage.url(variant[1])
+
+
+def srcset(fieldfile):
+
+    variants = sorted(available_variants(fieldfile).values())
+    return ', '.join(f'{default_storage.url(name)} {width}w' for width, name in variants)
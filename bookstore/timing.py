@@ -0,0 +1,69 @@
+import contextvars
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+
+current_timing = contextvars.ContextVar('bookstore_timing', default=None)
+
+
+class RequestTiming:
+    """Заміри одного запиту: SQL-запити, час БД, рендеринг шаблонів і view."""
+
+    def __init__(self):
+        self.queries = []
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.view_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.queries.append((context['connection'].alias, sql, duration))
+
+    def server_timing(self):
+
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="SQL ({len(self.queries)})"',
+            f'tpl;dur={self.template_time * 1000:.1f};desc="Templates"',
+            f'view;dur={self.view_time * 1000:.1f};desc="View"',
+        ])
+
+    def as_dict(self, request, response):
+
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': len(self.queries),
+            'db_ms': round(self.db_time * 1000, 1),
+            'template_ms': round(self.template_time * 1000, 1),
+            'view_ms': round(self.view_time * 1000, 1),
+        }
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        timing = current_timing.get()
+        if timing is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бекенд DjangoTemplates, що додає час рендерингу до заміру поточного запиту."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
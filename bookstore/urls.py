@@ -9,6 +9,7 @@ urlpatterns = [
 
 
     path('books/', views.book_list, name='book_list'),
+    path('books/suggest/', views.book_suggest, name='book_suggest'),
     path('books/<int:pk>/', views.book_detail, name='book_detail'),
     path('books/create/', views.book_create, name='book_create'),
     path('books/<int:pk>/edit/', views.book_update, name='book_update'),
@@ -2,25 +2,56 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count
+from django.core.exceptions import ValidationError
+from django.db.models import Q, Count, Max, Prefetch
+from django.db.models.functions import Left
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from .models import (
     Book, Author, Publisher, Genre, UserProfile,
-    Cart, CartItem, Order, OrderItem
+    Cart, CartItem, Order, OrderItem, RelatedBook
 )
 from .forms import (
     UserRegistrationForm, UserLoginForm, UserProfileForm,
     UserUpdateForm, BookForm, AuthorForm, PublisherForm,
     BookSearchForm, CheckoutForm
 )
+from .cart import invalidate_cart_count, remember_cart_count
+from .conditional import conditional_page, latest
+from .counters import view_counter
+from .orders import InsufficientStock, place_order
+from .page_cache import anonymous_page_cache
+from .pagination import CursorPaginator, use_cursor_pagination
+from .search import search_books
+from .suggest import suggest_index
 
 
+# list cards show about 20 words of a bio or description; no need to fetch the whole text
+EXCERPT_LENGTH = 300
+
+BOOK_ORDERINGS = {
+    'price_asc': ('final_price', 'id'),
+    'price_desc': ('-final_price', '-id'),
+    'popularity': ('-views', '-id'),
+    'title': ('title', 'id'),
+}
+
+
+def paginate(request, queryset, per_page, ordering):
+
+    if use_cursor_pagination(request):
+        return CursorPaginator(queryset, per_page, ordering).get_page(request.GET.get('cursor'))
+
+    paginator = Paginator(queryset.order_by(*ordering), per_page)
+    return paginator.get_page(request.GET.get('page'))
+
+
+@anonymous_page_cache()
 def index(request):
 
-    featured_books = Book.objects.filter(stock__gt=0).order_by('-views')[:8]
-    new_books = Book.objects.filter(stock__gt=0).order_by('-created_at')[:8]
-    popular_genres = Genre.objects.annotate(book_count=Count('books')).order_by('-book_count')[:6]
+    featured_books = Book.objects.cards().filter(stock__gt=0).order_by('-views')[:8]
+    new_books = Book.objects.cards().filter(stock__gt=0).order_by('-created_at')[:8]
+    popular_genres = Genre.objects.order_by('-in_stock_book_count', 'name')[:6]
 
     context = {
         'featured_books': featured_books,
@@ -31,19 +62,26 @@ def index(request):
 
 
 
-def book_list(request):
+def price_range(request):
+
+    # only the price fields are cleaned: the full form would query genres and publishers
+    bounds = []
+    for name in ('min_price', 'max_price'):
+        try:
+            bounds.append(BookSearchForm.base_fields[name].clean(request.GET.get(name, '')))
+        except ValidationError:
+            bounds.append(None)
+    return bounds
+
 
-    books = Book.objects.filter(stock__gt=0).select_related('publisher').prefetch_related('authors', 'genres')
+def filter_books(request):
+
+    books = Book.objects.cards().filter(stock__gt=0)
 
 
     query = request.GET.get('query', '')
     if query:
-        books = books.filter(
-            Q(title__icontains=query) |
-            Q(authors__first_name__icontains=query) |
-            Q(authors__last_name__icontains=query) |
-            Q(isbn__icontains=query)
-        ).distinct()
+        books = search_books(books, query)
 
 
     genre_id = request.GET.get('genre')
@@ -56,26 +94,47 @@ def book_list(request):
         books = books.filter(publisher__id=publisher_id)
 
 
+    min_price, max_price = price_range(request)
+    if min_price is not None:
+        books = books.filter(final_price__gte=min_price)
+    if max_price is not None:
+        books = books.filter(final_price__lte=max_price)
+
+    return books
+
+
+def book_list_validators(request):
+
+    books = filter_books(request).order_by().aggregate(last=Max('updated_at'), count=Count('id'))
+    genres = Genre.objects.aggregate(last=Max('updated_at'), count=Count('id'))
+    publishers = Publisher.objects.aggregate(last=Max('updated_at'), count=Count('id'))
+    parts = [books['last'], books['count'], genres['last'], genres['count'], publishers['last'], publishers['count']]
+    return parts, latest(books['last'], genres['last'], publishers['last'])
+
+
+@anonymous_page_cache()
+@conditional_page(book_list_validators)
+def book_list(request):
+
+    books = filter_books(request)
+    query = request.GET.get('query', '')
+    genre_id = request.GET.get('genre')
+    publisher_id = request.GET.get('publisher')
+
+
     sort_by = request.GET.get('sort_by', '')
-    if sort_by == 'price_asc':
-        books = books.order_by('price')
-    elif sort_by == 'price_desc':
-        books = books.order_by('-price')
-    elif sort_by == 'popularity':
-        books = books.order_by('-views')
-    elif sort_by == 'title':
-        books = books.order_by('title')
+    if sort_by in BOOK_ORDERINGS:
+        ordering = BOOK_ORDERINGS[sort_by]
+    elif query:
+        ordering = ('search_rank', 'id')
     else:
-        books = books.order_by('-created_at')
-
+        ordering = ('-created_at', '-id')
 
-    paginator = Paginator(books, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, books, 12, ordering)
 
 
-    genres = Genre.objects.all()
-    publishers = Publisher.objects.all()
+    genres = Genre.objects.only('name')
+    publishers = Publisher.objects.only('name')
 
     context = {
         'page_obj': page_obj,
@@ -85,10 +144,44 @@ def book_list(request):
         'selected_genre': genre_id,
         'selected_publisher': publisher_id,
         'sort_by': sort_by,
+        'min_price': request.GET.get('min_price', ''),
+        'max_price': request.GET.get('max_price', ''),
     }
     return render(request, 'bookstore/book_list.html', context)
 
 
+def book_suggest(request):
+
+    try:
+        limit = int(request.GET.get('limit', 8))
+    except ValueError:
+        limit = 8
+    query = request.GET.get('q', '')
+    return JsonResponse({'query': query, 'suggestions': suggest_index.suggest(query, limit)})
+
+
+def book_detail_validators(request, pk):
+
+    book = Book.objects.filter(pk=pk).aggregate(
+        last=Max('updated_at'), publisher=Max('publisher__updated_at'), genres=Max('genres__updated_at')
+    )
+    if book['last'] is None:
+        return None
+    related = RelatedBook.objects.filter(book_id=pk, related__stock__gt=0).aggregate(
+        last=Max('related__updated_at'), newest=Max('id'), count=Count('id')
+    )
+    parts = [book['last'], book['publisher'], book['genres'], related['last'], related['newest'], related['count']]
+    return parts, latest(book['last'], book['publisher'], book['genres'], related['last'])
+
+
+def count_book_view(request, pk):
+
+    view_counter.record(int(pk))
+
+
+# a 304 or a cached page is still a visit, so it is counted as well
+@anonymous_page_cache(on_hit=count_book_view)
+@conditional_page(book_detail_validators, on_not_modified=count_book_view)
 def book_detail(request, pk):
 
     book = get_object_or_404(
@@ -97,14 +190,13 @@ def book_detail(request, pk):
     )
 
 
-    book.views += 1
-    book.save(update_fields=['views'])
+    book.views += view_counter.record(book.pk)
 
 
-    related_books = Book.objects.filter(
-        genres__in=book.genres.all(),
+    related_books = Book.objects.cards().filter(
+        related_from__book=book,
         stock__gt=0
-    ).exclude(pk=book.pk).distinct()[:4]
+    ).order_by('related_from__rank')[:4]
 
     context = {
         'book': book,
@@ -116,7 +208,7 @@ def book_detail(request, pk):
 
 def author_list(request):
 
-    authors = Author.objects.annotate(book_count=Count('books')).order_by('last_name')
+    authors = Author.objects.defer('bio').annotate(bio_excerpt=Left('bio', EXCERPT_LENGTH))
 
 
     query = request.GET.get('query', '')
@@ -127,9 +219,7 @@ def author_list(request):
         )
 
 
-    paginator = Paginator(authors, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, authors, 20, ('last_name', 'id'))
 
     context = {
         'page_obj': page_obj,
@@ -138,10 +228,23 @@ def author_list(request):
     return render(request, 'bookstore/author_list.html', context)
 
 
+def author_detail_validators(request, pk):
+
+    author = Author.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if author is None:
+        return None
+    books = Book.objects.filter(authors=pk, stock__gt=0).aggregate(
+        last=Max('updated_at'), publisher=Max('publisher__updated_at'), count=Count('id')
+    )
+    return [author, books['last'], books['publisher'], books['count']], \
+        latest(author, books['last'], books['publisher'])
+
+
+@conditional_page(author_detail_validators)
 def author_detail(request, pk):
 
     author = get_object_or_404(Author, pk=pk)
-    books = Book.objects.filter(authors=author, stock__gt=0).select_related('publisher')
+    books = Book.objects.cards().filter(authors=author, stock__gt=0)
 
     context = {
         'author': author,
@@ -153,7 +256,9 @@ def author_detail(request, pk):
 
 def publisher_list(request):
 
-    publishers = Publisher.objects.annotate(book_count=Count('books')).order_by('name')
+    publishers = Publisher.objects.defer('description').annotate(
+        description_excerpt=Left('description', EXCERPT_LENGTH)
+    )
 
 
     query = request.GET.get('query', '')
@@ -161,9 +266,7 @@ def publisher_list(request):
         publishers = publishers.filter(name__icontains=query)
 
 
-    paginator = Paginator(publishers, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, publishers, 20, ('name', 'id'))
 
     context = {
         'page_obj': page_obj,
@@ -172,10 +275,20 @@ def publisher_list(request):
     return render(request, 'bookstore/publisher_list.html', context)
 
 
+def publisher_detail_validators(request, pk):
+
+    publisher = Publisher.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if publisher is None:
+        return None
+    books = Book.objects.filter(publisher=pk, stock__gt=0).aggregate(last=Max('updated_at'), count=Count('id'))
+    return [publisher, books['last'], books['count']], latest(publisher, books['last'])
+
+
+@conditional_page(publisher_detail_validators)
 def publisher_detail(request, pk):
 
     publisher = get_object_or_404(Publisher, pk=pk)
-    books = Book.objects.filter(publisher=publisher, stock__gt=0).prefetch_related('authors')
+    books = Book.objects.cards().filter(publisher=publisher, stock__gt=0)
 
     context = {
         'publisher': publisher,
@@ -284,7 +397,10 @@ def profile_edit(request):
 @login_required
 def order_detail(request, pk):
 
-    order = get_object_or_404(Order, pk=pk, user=request.user)
+    order = get_object_or_404(
+        Order.objects.prefetch_related(Prefetch('items', queryset=OrderItem.objects.select_related('book'))),
+        pk=pk, user=request.user
+    )
     return render(request, 'bookstore/order_detail.html', {'order': order})
 
 
@@ -297,7 +413,8 @@ from django.shortcuts import render
 def cart_view(request):
 
     cart, created = Cart.objects.get_or_create(user=request.user)
-    cart_items = cart.items.select_related('book').all()
+    cart_items = cart.items.select_related('book__publisher').all()
+    remember_cart_count(request, cart)
 
     context = {
         'cart': cart,
@@ -327,6 +444,7 @@ def add_to_cart(request, pk):
     else:
         messages.error(request, 'Книга відсутня на складі.')
 
+    invalidate_cart_count(request)
     return redirect(request.META.get('HTTP_REFERER', 'bookstore:book_list'))
 
 
@@ -336,6 +454,7 @@ def remove_from_cart(request, pk):
     cart_item = get_object_or_404(CartItem, pk=pk, cart__user=request.user)
     book_title = cart_item.book.title
     cart_item.delete()
+    invalidate_cart_count(request)
     messages.info(request, f'"{book_title}" видалено з кошика.')
     return redirect('bookstore:cart')
 
@@ -356,6 +475,7 @@ def update_cart_item(request, pk):
         else:
             cart_item.delete()
             messages.info(request, 'Товар видалено з кошика.')
+        invalidate_cart_count(request)
 
     return redirect('bookstore:cart')
 
@@ -383,24 +503,16 @@ def checkout(request):
 
             order = form.save(commit=False)
             order.user = request.user
-            order.total_price = cart.total_price
-            order.save()
-
-
-            for item in cart_items:
-                OrderItem.objects.create(
-                    order=order,
-                    book=item.book,
-                    quantity=item.quantity,
-                    price=item.book.final_price
-                )
-
-
-                item.book.stock -= item.quantity
-                item.book.save()
-
-
-            cart_items.delete()
+            try:
+                order = place_order(order, cart)
+            except InsufficientStock as error:
+                messages.error(request, str(error))
+                return redirect('bookstore:cart')
+
+            invalidate_cart_count(request)
+            if order is None:
+                messages.warning(request, 'Ваш кошик порожній.')
+                return redirect('bookstore:cart')
 
             messages.success(request, f'Замовлення #{order.id} успішно створено!')
             return redirect('bookstore:order_detail', pk=order.id)
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'bookstore.middleware.ServerTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -38,7 +39,8 @@ ROOT_URLCONF = 'bookstore_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # reports template render time to ServerTimingMiddleware
+        'BACKEND': 'bookstore.timing.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -56,11 +58,75 @@ TEMPLATES = [
 WSGI_APPLICATION = 'bookstore_project.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# BOOKSTORE_DB_PROFILE picks the database setup:
+#   'sqlite'     — plain SQLite for development, a new connection per request;
+#   'sqlite-wal' — SQLite in WAL mode with the pragmas below and persistent connections;
+#   'postgres'   — PostgreSQL from the POSTGRES_* environment variables.
+BOOKSTORE_DB_PROFILE = os.environ.get('BOOKSTORE_DB_PROFILE', 'sqlite')
+
+# Applied to every new connection of the 'sqlite-wal' profile (see manage.py bench_sqlite)
+BOOKSTORE_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # readers no longer wait for a writer
+    'synchronous': 'NORMAL',  # fsync only at checkpoints, safe with WAL
+    'busy_timeout': 5000,  # ms a writer waits for the lock instead of failing
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,  # negative means KiB, i.e. 64 MB per connection
+    'temp_store': 'MEMORY',
+}
+
+BOOKSTORE_DB_CONN_MAX_AGE = int(os.environ.get('BOOKSTORE_DB_CONN_MAX_AGE', 600))
+
+if BOOKSTORE_DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+elif BOOKSTORE_DB_PROFILE == 'sqlite-wal':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': '; '.join(f'PRAGMA {name}={value}' for name, value in BOOKSTORE_SQLITE_PRAGMAS.items()),
+                # take the write lock at BEGIN so busy_timeout applies instead of
+                # failing when a read transaction tries to upgrade
+                'transaction_mode': 'IMMEDIATE',
+            },
+            'CONN_MAX_AGE': BOOKSTORE_DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+elif BOOKSTORE_DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'bookstore'),
+            'USER': os.environ.get('POSTGRES_USER', 'bookstore'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': BOOKSTORE_DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
+else:
+    from django.core.exceptions import ImproperlyConfigured
+    raise ImproperlyConfigured(f"Unknown BOOKSTORE_DB_PROFILE: {BOOKSTORE_DB_PROFILE!r}")
+
+# 'pages' holds the anonymous page cache; it is file based so that every worker
+# process on the host sees the same version counter. Point it at Redis or
+# Memcached when the site runs on more than one host.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'pages',
+        'TIMEOUT': 600,
+    },
 }
 
 # Password validation
@@ -107,3 +173,50 @@ LOGIN_URL = 'bookstore:login'
 LOGIN_REDIRECT_URL = 'bookstore:index'
 LOGOUT_REDIRECT_URL = 'bookstore:index'
 
+
+
+# Full-text search
+BOOKSTORE_SEARCH_LIMIT = 500
+
+# In-memory search suggestions (/books/suggest/), rebuilt in the background after this many seconds
+BOOKSTORE_SUGGEST_MAX_AGE = 600
+
+# Keyset pagination for listings (also enabled per request by ?cursor=)
+BOOKSTORE_CURSOR_PAGINATION = False
+BOOKSTORE_CURSOR_COUNT_LIMIT = 1000
+
+# Admin changelists count at most this many rows (PostgreSQL uses the planner estimate)
+BOOKSTORE_ADMIN_COUNT_LIMIT = 10000
+
+# Book page views are buffered in memory and written in batches
+BOOKSTORE_VIEWS_FLUSH_INTERVAL = 10  # seconds; 0 disables the background flusher
+BOOKSTORE_VIEWS_FLUSH_THRESHOLD = 1000  # buffered views that force an immediate flush
+
+# Precomputed related books (see manage.py rebuild_related_books)
+BOOKSTORE_RELATED_LIMIT = 8
+BOOKSTORE_RELATED_CANDIDATES_PER_GENRE = 200
+BOOKSTORE_RELATED_WEIGHTS = {'genre': 1.0, 'author': 2.0, 'purchase': 0.5}
+
+# Resized cover/photo/logo/avatar variants, generated in a process pool after upload
+BOOKSTORE_THUMBNAIL_WORKERS = 2  # 0 generates synchronously in the request
+BOOKSTORE_THUMBNAIL_FORMAT = 'WEBP'
+BOOKSTORE_THUMBNAIL_QUALITY = 80
+
+# Full-page cache for anonymous visitors, invalidated by catalog signals
+BOOKSTORE_PAGE_CACHE_ALIAS = 'pages'
+BOOKSTORE_PAGE_CACHE_TIMEOUT = 600  # seconds; 0 disables the cache
+
+# Server-Timing header and timing log lines for a share of requests
+BOOKSTORE_TIMING_SAMPLE_RATE = 1.0 if DEBUG else 0.01
+BOOKSTORE_SLOW_REQUEST_MS = 500  # requests slower than this log their full SQL; 0 disables
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'bookstore.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}